@@ -1,25 +1,45 @@
-from datetime import datetime
 import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
 import os
 import functools
+import time
+from query_log import get_logger
 
 # Load environment variables from .env file
 load_dotenv()
 
-def log_queries():
-    """Decorator to log SQL queries with timestamps before execution."""
+def log_queries(logger=None):
+    """Decorator to record each query's normalized SQL, bound-param count, wall time, rows and errors.
+
+    Records go to a background writer (query_log.get_logger() by default), so
+    the call itself only pays for a timer and a buffer append.
+    """
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # The query is the first positional argument passed to the function
-            query = args[0] if args else kwargs.get('query', 'Unknown query')
-            # Get current timestamp and log the query
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            print(f"[{timestamp}] Executing query: {query}")
-            # Call the original function with its arguments
-            return func(*args, **kwargs)
+            # The query is the first positional argument passed to the function, its params the second
+            query = args[0] if args else kwargs.get('query')
+            params = args[1] if len(args) > 1 else kwargs.get('params')
+            # Only a sequence or mapping is a bound-parameter set; anything else is unknown
+            if params is None:
+                param_count = 0
+            elif isinstance(params, (list, tuple, dict)):
+                param_count = len(params)
+            else:
+                param_count = None
+            log = logger or get_logger()
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                log.record(func.__qualname__, query, param_count,
+                           (time.perf_counter() - start) * 1000, None, f"{type(e).__name__}: {e}")
+                raise
+            rows = len(result) if isinstance(result, (list, tuple)) else None
+            log.record(func.__qualname__, query, param_count,
+                       (time.perf_counter() - start) * 1000, rows)
+            return result
         return wrapper
     return decorator
 
@@ -1,37 +1,24 @@
-import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
-import os
 import functools
+from db_pool import get_pool
 import time
 
 # Load environment variables from .env file
 load_dotenv()
 
 def with_db_connection(func):
-    """Decorator to automatically handle opening and closing database connections."""
+    """Decorator to check a pooled database connection out for the call and return it afterwards."""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        connection = None
         try:
-            # Open database connection
-            connection = mysql.connector.connect(
-                host=os.getenv("MYSQL_HOST"),
-                user=os.getenv("MYSQL_USER"),
-                password=os.getenv("MYSQL_PASSWORD"),
-                database=os.getenv("MYSQL_DATABASE")
-            )
-            if connection.is_connected():
+            # Borrow a connection from the shared pool instead of connecting per call
+            with get_pool().connection() as connection:
                 # Pass the connection as the first argument to the function
                 return func(connection, *args, **kwargs)
         except Error as e:
             print(f"Error opening database connection: {e}")
             return None
-        finally:
-            # Close the connection if it was opened
-            if connection and connection.is_connected():
-                connection.close()
-                print("Database connection closed")
     return wrapper
 
 def retry_on_failure(retries=3, delay=2):
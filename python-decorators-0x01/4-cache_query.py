@@ -1,57 +1,87 @@
-import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
-import os
 import functools
+from db_pool import get_pool
+from query_cache import FRESH, STALE, SingleFlight, make_key, query_cache, register_backend, tables_in
 import time
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Cache dictionary to store query results
-query_cache = {}
-
 def with_db_connection(func):
-    """Decorator to automatically handle opening and closing database connections."""
+    """Decorator to check a pooled database connection out for the call and return it afterwards."""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        connection = None
         try:
-            # Open database connection
-            connection = mysql.connector.connect(
-                host=os.getenv("MYSQL_HOST"),
-                user=os.getenv("MYSQL_USER"),
-                password=os.getenv("MYSQL_PASSWORD"),
-                database=os.getenv("MYSQL_DATABASE")
-            )
-            if connection.is_connected():
+            # Borrow a connection from the shared pool instead of connecting per call
+            with get_pool().connection() as connection:
                 # Pass the connection as the first argument to the function
                 return func(connection, *args, **kwargs)
         except Error as e:
             print(f"Error opening database connection: {e}")
             return None
-        finally:
-            # Close the connection if it was opened
-            if connection and connection.is_connected():
-                connection.close()
-                print("Database connection closed")
     return wrapper
 
-def cache_query(func):
-    """Decorator to cache the results of database queries based on the query string."""
-    @functools.wraps(func)
-    def wrapper(conn, query, *args, **kwargs):
-        # Check if the query is already in the cache
-        if query in query_cache:
-            print(f"Returning cached result for query: {query}")
-            return query_cache[query]
-        
-        # If not cached, execute the function and cache the result
-        result = func(conn, query, *args, **kwargs)
-        query_cache[query] = result
-        print(f"Cached result for query: {query}")
-        return result
-    return wrapper
+def cache_query(func=None, *, ttl=None, stale_ttl=0.0, cache=query_cache):
+    """Decorator to cache query results keyed on the normalized SQL and its bound parameters.
+
+    Use it bare or with options, e.g. @cache_query(ttl=60). Each result is
+    tagged with the tables its query reads, so a transactional write to one
+    of those tables evicts it. Concurrent misses for the same key are
+    coalesced into a single query. With stale_ttl, an expired result is
+    served for up to that many more seconds while one background refresh,
+    on its own pooled connection, replaces it. `cache` is any query_cache
+    backend; the default is chosen by QUERY_CACHE_BACKEND (memory, shm or
+    sqlite) so workers on one host can share a warm cache. Every backend
+    passed here is registered, so transactional writes invalidate it too.
+    """
+    # Writes committed by transactional invalidate every backend a cache_query reads from
+    register_backend(cache)
+
+    def decorator(func):
+        flight = SingleFlight()
+
+        @functools.wraps(func)
+        def wrapper(conn, query, *args, **kwargs):
+            key = make_key(query, *args, **kwargs)
+
+            def load(conn):
+                # Another caller may have filled the entry while this one waited
+                found, result = cache.get(key)
+                if found:
+                    return result
+                result = func(conn, query, *args, **kwargs)
+                cache.set(key, result, ttl=ttl, tables=tables_in(query), stale_ttl=stale_ttl)
+                print(f"Cached result for query: {query}")
+                return result
+
+            def refresh():
+                try:
+                    with get_pool().connection() as connection:
+                        result = func(connection, query, *args, **kwargs)
+                    cache.set(key, result, ttl=ttl, tables=tables_in(query), stale_ttl=stale_ttl)
+                    print(f"Refreshed cached result for query: {query}")
+                    return result
+                except Exception as e:
+                    print(f"Error refreshing cached result for query {query}: {e}")
+                    raise
+
+            # Check if the query is already in the cache
+            status, result = cache.lookup(key)
+            if status == FRESH:
+                print(f"Returning cached result for query: {query}")
+                return result
+            if status == STALE:
+                flight.do_in_background(key, refresh)
+                print(f"Returning stale cached result for query: {query}")
+                return result
+
+            # If not cached, execute the query once however many callers are waiting on it
+            return flight.do(key, lambda: load(conn))
+        return wrapper
+    if func is not None:
+        return decorator(func)
+    return decorator
 
 @with_db_connection
 @cache_query
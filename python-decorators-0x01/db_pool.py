@@ -0,0 +1,198 @@
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import InterfaceError, OperationalError, PoolError
+from dotenv import load_dotenv
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+#Open a new connection to the configured database.
+def connect():
+    return mysql.connector.connect(
+        host=os.getenv("MYSQL_HOST"),
+        user=os.getenv("MYSQL_USER"),
+        password=os.getenv("MYSQL_PASSWORD"),
+        database=os.getenv("MYSQL_DATABASE"),
+        consume_results=True  # Unread rows are drained so the connection can be reused
+    )
+
+
+class _PooledConnection:
+    """Bookkeeping for one connection owned by the pool."""
+
+    __slots__ = ("connection", "created_at", "last_used")
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of MySQL connections.
+
+    At most max_size connections exist. A checkout reuses the most recently
+    returned idle connection, pinging it first when it has been idle longer
+    than health_check_after seconds, and discarding it once it is older than
+    max_lifetime seconds. When every connection is in use, a checkout waits
+    up to checkout_timeout seconds and then raises PoolError.
+    """
+
+    def __init__(self, max_size=5, max_lifetime=1800.0, health_check_after=30.0,
+                 checkout_timeout=5.0, factory=connect):
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self.checkout_timeout = checkout_timeout
+        self.factory = factory
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._lock = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'created': 0,
+            'discarded': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+        }
+
+    def _expired(self, pooled, now):
+        return now - pooled.created_at > self.max_lifetime
+
+    def _discard(self, pooled):
+        """Close a connection that left the pool; the caller already holds no slot for it."""
+        try:
+            pooled.connection.close()
+        except Error:
+            pass
+        with self._lock:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._lock.notify()
+
+    def acquire(self, timeout=None):
+        """Check out a healthy connection, waiting up to `timeout` seconds."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            pooled = None
+            create = False
+            with self._lock:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolError(
+                            f"No connection available within {timeout:.1f}s "
+                            f"({self._size}/{self.max_size} in use)"
+                        )
+                    self._lock.wait(remaining)
+                if self._idle:
+                    pooled = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+
+            now = time.monotonic()
+            if create:
+                try:
+                    pooled = _PooledConnection(self.factory())
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._stats['created'] += 1
+            elif self._expired(pooled, now) or (
+                now - pooled.last_used > self.health_check_after
+                and not pooled.connection.is_connected()
+            ):
+                self._discard(pooled)
+                continue
+
+            wait = time.monotonic() - start
+            with self._lock:
+                self._in_use[id(pooled.connection)] = pooled
+                self._stats['checkouts'] += 1
+                self._stats['wait_seconds_total'] += wait
+                self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], wait)
+            return pooled.connection
+
+    def release(self, connection, broken=False):
+        """Return a connection; broken or expired connections are closed instead."""
+        with self._lock:
+            pooled = self._in_use.pop(id(connection))
+        if not broken and not self._expired(pooled, time.monotonic()):
+            try:
+                connection.rollback()  # Never hand the next caller an open transaction
+            except Error:
+                broken = True
+        if broken or self._expired(pooled, time.monotonic()):
+            self._discard(pooled)
+            return
+        pooled.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(pooled)
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that checks a connection out and returns it afterwards."""
+        connection = self.acquire(timeout)
+        broken = False
+        try:
+            yield connection
+        except (InterfaceError, OperationalError):
+            broken = True  # The link itself failed; do not reuse it
+            raise
+        finally:
+            self.release(connection, broken)
+
+    def metrics(self):
+        """Return pool size, in-use and idle counts plus checkout wait statistics."""
+        with self._lock:
+            metrics = dict(self._stats)
+            metrics.update({
+                'size': self._size,
+                'max_size': self.max_size,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+            })
+        checkouts = metrics['checkouts']
+        metrics['wait_seconds_avg'] = metrics['wait_seconds_total'] / checkouts if checkouts else 0.0
+        return metrics
+
+    def close(self):
+        """Close every idle connection; connections in use close when released."""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for pooled in idle:
+            self._discard(pooled)
+
+
+# Process-wide pool shared by with_db_connection, created on first use
+_pool = None
+_pool_lock = threading.Lock()
+
+
+#Return the shared pool, sized from the MYSQL_POOL_SIZE environment variable (default 5).
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                max_size=int(os.getenv("MYSQL_POOL_SIZE", "5")),
+                checkout_timeout=float(os.getenv("MYSQL_POOL_TIMEOUT", "5"))
+            )
+        return _pool
@@ -0,0 +1,854 @@
+from dotenv import load_dotenv
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import re
+import sqlite3
+import stat
+import struct
+import tempfile
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Protocol 5 pickles rows compactly and is readable by every worker on the host
+PICKLE_PROTOCOL = 5
+
+# Quoted literals are kept verbatim while the SQL around them is normalized
+_LITERAL = re.compile(r"('(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"|`[^`]*`)")
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+# FROM and UPDATE take comma-separated table lists, ended by the next clause or a parenthesis
+_TABLE_LIST = re.compile(
+    r"\b(?:FROM|UPDATE)\s+([^();]+?)\s*(?=\b(?:WHERE|SET|GROUP|ORDER|LIMIT|HAVING|UNION|JOIN|INNER|LEFT"
+    r"|RIGHT|CROSS|NATURAL|STRAIGHT_JOIN|USING|ON|FOR|LOCK|WINDOW|PARTITION)\b|[();]|$)",
+    re.IGNORECASE,
+)
+_TABLE = re.compile(r"\b(?:JOIN|INTO(?:\s+TABLE)?|TRUNCATE(?:\s+TABLE)?|TABLE)\s+([A-Za-z0-9_$.]+)", re.IGNORECASE)
+_TABLE_NAME = re.compile(r"\s*([A-Za-z0-9_$.]+)")
+_SPACE = re.compile(r"\s+")
+# Only these words are case-folded; identifiers keep their case, as MySQL table names are case-sensitive
+_KEYWORDS = frozenset("""
+    ALL AND AS ASC BETWEEN BY CASE CROSS DELETE DESC DISTINCT DUPLICATE ELSE END EXISTS FOR FROM
+    GROUP HAVING IGNORE IN INNER INSERT INTO IS JOIN KEY LEFT LIKE LIMIT LOCK NATURAL NOT NULL
+    OFFSET ON OR ORDER OUTER REPLACE RIGHT SELECT SET SHARE STRAIGHT_JOIN THEN UNION UPDATE USING
+    VALUES WHEN WHERE WITH
+""".split())
+_WORD = re.compile(r"\b[A-Za-z_]+\b")
+_WRITE = re.compile(r"^\s*(?:INSERT|UPDATE|DELETE|REPLACE|TRUNCATE|ALTER|DROP|LOAD\s+DATA)\b", re.IGNORECASE)
+
+
+def _upper_keyword(match):
+    word = match.group(0)
+    upper = word.upper()
+    return upper if upper in _KEYWORDS else word
+
+
+def normalize_sql(query):
+    """Collapse whitespace, upper-case keywords and drop a trailing semicolon.
+
+    Identifiers, placeholders and quoted text keep their case.
+
+    >>> normalize_sql("select *\\n  from Users where name = 'a  b' and age > %s;")
+    "SELECT * FROM Users WHERE name = 'a  b' AND age > %s"
+    """
+    parts = _LITERAL.split(query.strip().rstrip(";"))
+    for index in range(0, len(parts), 2):
+        parts[index] = _WORD.sub(_upper_keyword, _SPACE.sub(" ", parts[index]))
+    return "".join(parts).strip()
+
+
+def tables_in(query):
+    """Return the lower-cased table names a statement reads or writes.
+
+    >>> sorted(tables_in("SELECT * FROM user_data u JOIN orders o ON o.user_id = u.user_id"))
+    ['orders', 'user_data']
+    >>> sorted(tables_in("UPDATE `ALX_prodev`.`user_data` u, orders SET u.age = 1"))
+    ['orders', 'user_data']
+    """
+    # Blank string literals, then drop backticks so quoted identifiers read as plain names
+    query = _STRING.sub("''", query).replace("`", "")
+    names = _TABLE.findall(query)
+    for table_list in _TABLE_LIST.findall(query):
+        for item in table_list.split(","):
+            match = _TABLE_NAME.match(item)
+            if match:
+                names.append(match.group(1))
+    return {name.lower().split(".")[-1] for name in names}
+
+
+def is_write(query):
+    return bool(_WRITE.match(query))
+
+
+def _freeze(value):
+    """Turn bound parameters into a hashable form for use in a cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def make_key(query, *params, **named_params):
+    """Cache key from the normalized SQL plus every bound parameter."""
+    return normalize_sql(query), _freeze(params), _freeze(named_params)
+
+
+def key_digest(key):
+    """Stable 16-byte digest of a cache key, identical in every process."""
+    return hashlib.blake2b(pickle.dumps(key, protocol=PICKLE_PROTOCOL), digest_size=16).digest()
+
+
+FRESH = "fresh"
+STALE = "stale"
+
+# Backends in use by cache_query, so a committed write invalidates whichever cache its readers used
+_backends = weakref.WeakSet()
+_backends_lock = threading.Lock()
+
+
+def register_backend(backend):
+    """Subscribe a backend to invalidate_all(); returns the backend."""
+    with _backends_lock:
+        _backends.add(backend)
+    return backend
+
+
+def invalidate_all(tables):
+    """Drop entries tagged with any of `tables` from every live backend; returns how many."""
+    with _backends_lock:
+        backends = list(_backends)
+    return sum(backend.invalidate_tables(tables) for backend in backends)
+
+
+class CacheBackend:
+    """Storage interface behind cache_query and transactional.
+
+    Backends store results under the keys built by make_key(), tagged with
+    the tables they read. lookup() reports FRESH or STALE hits; set() stores
+    a result with a TTL and an optional stale window; invalidate_tables()
+    drops every entry tagged with a written table.
+    """
+
+    def __init__(self, default_ttl=300.0):
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def _count(self, status):
+        if status == FRESH:
+            self.hits += 1
+        elif status == STALE:
+            self.stale_hits += 1
+        else:
+            self.misses += 1
+
+    def lookup(self, key):
+        """Return (FRESH, value), (STALE, value) or (None, None) for a miss."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None, tables=(), stale_ttl=0.0):
+        raise NotImplementedError
+
+    def invalidate_tables(self, tables):
+        """Drop every entry tagged with any of `tables`; returns how many were dropped."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+        }
+
+    def close(self):
+        with _backends_lock:
+            _backends.discard(self)
+
+    def get(self, key):
+        """Return (True, value) for a fresh entry, else (False, None)."""
+        status, value = self.lookup(key)
+        if status == FRESH:
+            return True, value
+        return False, None
+
+    def __contains__(self, key):
+        found, _ = self.get(key)
+        return found
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "stale_until", "tables")
+
+    def __init__(self, value, size, expires_at, stale_until, tables):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.tables = tables
+
+
+class QueryCache(CacheBackend):
+    """Thread-safe, in-process LRU cache of query results with TTLs and table tags.
+
+    Entries are evicted least recently used first once either max_entries or
+    max_bytes (measured as the pickled size of the result) would be exceeded.
+    Each entry expires after its TTL and is tagged with the tables its query
+    reads, so invalidate_tables() drops every result a write may have changed.
+    An entry stored with a stale_ttl stays available to lookup() as STALE for
+    that many seconds after it expires, for stale-while-revalidate callers.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, default_ttl=300.0):
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._by_table = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+        return entry
+
+    def lookup(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.stale_until <= now:
+                if entry is not None:
+                    self._remove(key)
+                status = None
+            else:
+                self._entries.move_to_end(key)
+                status = STALE if entry.expires_at <= now else FRESH
+            self._count(status)
+            return status, entry.value if status else None
+
+    def set(self, key, value, ttl=None, tables=(), stale_ttl=0.0):
+        """Store a result; results larger than max_bytes are not cached."""
+        size = len(pickle.dumps(value, protocol=PICKLE_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl
+        entry = _Entry(value, size, expires_at, expires_at + stale_ttl, frozenset(tables))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and (len(self._entries) >= self.max_entries
+                                     or self._bytes + size > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = entry
+            self._bytes += size
+            for table in entry.tables:
+                self._by_table.setdefault(table, set()).add(key)
+
+    def invalidate_tables(self, tables):
+        with self._lock:
+            keys = set()
+            for table in tables:
+                keys.update(self._by_table.get(table.lower(), ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats.update({
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'evictions': self.evictions,
+            })
+        return stats
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_FILE_HEADER = struct.Struct("<8sII")
+# used, key digest, expires_at, stale_until, last_used, payload length, table mask
+_SLOT_HEADER = struct.Struct("<B16sdddIQ")
+_MAGIC = b"QCACHE01"
+
+
+#Return a 64-bit mask with one bit per table name, stable across processes.
+def table_mask(tables):
+    mask = 0
+    for table in tables:
+        mask |= 1 << (zlib.crc32(table.lower().encode()) % 64)
+    return mask
+
+
+def private_cache_dir(base):
+    """Return a directory under `base` that only the current user can access.
+
+    Cached results are unpickled on read, so a file another local user can
+    write is a code-execution hole. The directory is created with mode 0700
+    and refused if it is a symlink, belongs to someone else or is open to
+    group or others.
+    """
+    directory = os.path.join(base, f"query_cache-{os.getuid()}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{directory} must be a directory owned by uid {os.getuid()} with mode 0700")
+    return directory
+
+
+def default_cache_path(filename, shared_memory=True):
+    """Place cache files in a private per-user directory in /dev/shm, or the temp directory."""
+    base = "/dev/shm" if shared_memory and os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(private_cache_dir(base), filename)
+
+
+#Open (creating if needed) a cache file, refusing symlinks and files another user could have written.
+def open_private_file(path, create=True):
+    flags = os.O_RDWR | os.O_NOFOLLOW | (os.O_CREAT if create else 0)
+    fd = os.open(path, flags, 0o600)
+    info = os.fstat(fd)
+    if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        os.close(fd)
+        raise PermissionError(f"{path} must be a regular file owned by uid {os.getuid()} with mode 0600")
+    return fd
+
+
+class SharedMemoryBackend(CacheBackend):
+    """Cross-process cache in a memory-mapped file, by default under /dev/shm.
+
+    The file holds max_entries fixed-size slots grouped into sets of `ways`.
+    A key can only live in the set its digest selects, and the least recently
+    used slot of a full set is overwritten, so the file never grows past
+    max_entries * slot_size bytes. Results whose pickle does not fit in a slot
+    are not cached. Each slot stores a 64-bit mask of its tables, so a hash
+    collision can evict an unrelated entry but never keeps a dependent one.
+    Access is serialized with a POSIX record lock between processes and a
+    thread lock within one. Expiry uses wall-clock time shared by all workers.
+
+    The default file name includes the geometry, so workers started with
+    different settings use separate files. An existing file is never resized:
+    opening one laid out for a different geometry raises ValueError, because
+    shrinking it would crash every process that still maps it. A file that is
+    a symlink, belongs to another user or is group/other accessible raises
+    PermissionError, since its contents are unpickled.
+    """
+
+    def __init__(self, path=None, max_entries=4096, slot_size=16384, ways=8, default_ttl=300.0):
+        super().__init__(default_ttl)
+        if slot_size <= _SLOT_HEADER.size:
+            raise ValueError(f"slot_size must exceed {_SLOT_HEADER.size} bytes")
+        self.ways = max(1, min(ways, max_entries))
+        self.sets = max(1, max_entries // self.ways)
+        self.slots = self.sets * self.ways
+        self.slot_size = slot_size
+        self.path = path or default_cache_path(f"query_cache-{self.slots}x{slot_size}.mmap")
+        self.max_payload = slot_size - _SLOT_HEADER.size
+        self._lock = threading.Lock()
+        size = _FILE_HEADER.size + self.slots * slot_size
+        self._fd = open_private_file(self.path)
+        try:
+            with self._locked():
+                current_size = os.fstat(self._fd).st_size
+                header = os.pread(self._fd, _FILE_HEADER.size, 0)
+                if current_size == 0 or (current_size == size and not any(header)):
+                    # New file: only ever grown from empty, never shrunk under a live mapping
+                    os.ftruncate(self._fd, size)
+                    os.pwrite(self._fd, _FILE_HEADER.pack(_MAGIC, self.slots, slot_size), 0)
+                elif (current_size != size or len(header) < _FILE_HEADER.size
+                      or _FILE_HEADER.unpack(header) != (_MAGIC, self.slots, slot_size)):
+                    raise ValueError(
+                        f"{self.path} holds a cache with a different layout than "
+                        f"{self.slots} slots of {slot_size} bytes; use another path"
+                    )
+            self._map = mmap.mmap(self._fd, size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def _offsets(self, digest):
+        first = int.from_bytes(digest[:8], "little") % self.sets * self.ways
+        for slot in range(first, first + self.ways):
+            yield _FILE_HEADER.size + slot * self.slot_size
+
+    def _all_offsets(self):
+        return range(_FILE_HEADER.size, _FILE_HEADER.size + self.slots * self.slot_size, self.slot_size)
+
+    def lookup(self, key):
+        digest = key_digest(key)
+        now = time.time()
+        status, payload = None, None
+        with self._locked():
+            for offset in self._offsets(digest):
+                used, slot_digest, expires_at, stale_until, _, length, mask = \
+                    _SLOT_HEADER.unpack_from(self._map, offset)
+                if not used or slot_digest != digest:
+                    continue
+                if stale_until <= now:
+                    self._map[offset] = 0
+                    break
+                _SLOT_HEADER.pack_into(self._map, offset, 1, digest, expires_at, stale_until,
+                                       now, length, mask)
+                start = offset + _SLOT_HEADER.size
+                payload = self._map[start:start + length]
+                status = STALE if expires_at <= now else FRESH
+                break
+        self._count(status)
+        return status, pickle.loads(payload) if status else None
+
+    def set(self, key, value, ttl=None, tables=(), stale_ttl=0.0):
+        """Store a result; results larger than one slot are not cached."""
+        payload = pickle.dumps(value, protocol=PICKLE_PROTOCOL)
+        if len(payload) > self.max_payload:
+            return
+        digest = key_digest(key)
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with self._locked():
+            target, oldest = None, None
+            for offset in self._offsets(digest):
+                used, slot_digest, _, stale_until, last_used, _, _ = \
+                    _SLOT_HEADER.unpack_from(self._map, offset)
+                if used and slot_digest == digest:
+                    target = offset
+                    break
+                if target is None and (not used or stale_until <= now):
+                    target = offset
+                elif used and (oldest is None or last_used < oldest[0]):
+                    oldest = (last_used, offset)
+            if target is None:
+                target = oldest[1]
+            # Clear the used flag first so a torn write is never read back
+            self._map[target] = 0
+            start = target + _SLOT_HEADER.size
+            self._map[start:start + len(payload)] = payload
+            _SLOT_HEADER.pack_into(self._map, target, 1, digest, expires_at, expires_at + stale_ttl,
+                                   now, len(payload), table_mask(tables))
+
+    def invalidate_tables(self, tables):
+        mask = table_mask(tables)
+        dropped = 0
+        with self._locked():
+            for offset in self._all_offsets():
+                used, _, _, _, _, _, slot_mask = _SLOT_HEADER.unpack_from(self._map, offset)
+                if used and slot_mask & mask:
+                    self._map[offset] = 0
+                    dropped += 1
+        return dropped
+
+    def clear(self):
+        with self._locked():
+            for offset in self._all_offsets():
+                self._map[offset] = 0
+
+    def stats(self):
+        stats = super().stats()
+        entries = 0
+        total = 0
+        now = time.time()
+        with self._locked():
+            for offset in self._all_offsets():
+                used, _, _, stale_until, _, length, _ = _SLOT_HEADER.unpack_from(self._map, offset)
+                if used and stale_until > now:
+                    entries += 1
+                    total += length
+        stats.update({'entries': entries, 'bytes': total, 'max_entries': self.slots})
+        return stats
+
+    def close(self):
+        super().close()
+        self._map.close()
+        os.close(self._fd)
+
+
+class SQLiteBackend(CacheBackend):
+    """Cross-process cache persisted in a SQLite database file.
+
+    Every thread gets its own connection to a WAL-mode database, so readers
+    in all workers proceed while one writer holds the lock. Entries are
+    evicted least recently used first once max_entries or max_bytes would be
+    exceeded, and a separate tag table maps each table name to its entries.
+    Triggers keep the entry count and byte total in a one-row metadata table,
+    so a write never scans the cache. Entries past their stale window are
+    swept at most once every sweep_interval seconds across all processes.
+    The cache survives restarts; expiry uses wall-clock time. The database and
+    its -wal/-shm files must be private to the current user, as for
+    SharedMemoryBackend, because cached values are unpickled.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            cache_key BLOB PRIMARY KEY,
+            value BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            stale_until REAL NOT NULL,
+            last_used REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_cache_last_used ON cache_entries (last_used)",
+        "CREATE INDEX IF NOT EXISTS idx_cache_stale_until ON cache_entries (stale_until)",
+        """
+        CREATE TABLE IF NOT EXISTS cache_tags (
+            table_name TEXT NOT NULL,
+            cache_key BLOB NOT NULL,
+            PRIMARY KEY (table_name, cache_key)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags (cache_key)",
+        """
+        CREATE TABLE IF NOT EXISTS cache_meta (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            entries INTEGER NOT NULL,
+            bytes INTEGER NOT NULL,
+            next_sweep REAL NOT NULL
+        )
+        """,
+        # Seeded from the existing rows once; the triggers keep it current afterwards
+        """
+        INSERT OR IGNORE INTO cache_meta (id, entries, bytes, next_sweep)
+        SELECT 0, COUNT(*), COALESCE(SUM(size), 0), 0 FROM cache_entries
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS cache_entries_counted_insert AFTER INSERT ON cache_entries
+        BEGIN
+            UPDATE cache_meta SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS cache_entries_counted_delete AFTER DELETE ON cache_entries
+        BEGIN
+            UPDATE cache_meta SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+        END
+        """,
+    )
+
+    def __init__(self, path=None, max_entries=100000, max_bytes=512 * 1024 * 1024,
+                 default_ttl=300.0, timeout=5.0, sweep_interval=60.0):
+        super().__init__(default_ttl)
+        self.path = path or default_cache_path("query_cache.sqlite3", shared_memory=False)
+        os.close(open_private_file(self.path))
+        for suffix in ("-wal", "-shm"):
+            if os.path.lexists(self.path + suffix):
+                os.close(open_private_file(self.path + suffix, create=False))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        connection = self._connection()
+        with self._transaction(connection):
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self, connection):
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    @staticmethod
+    def _delete(connection, keys):
+        rows = [(key,) for key in keys]
+        connection.executemany("DELETE FROM cache_entries WHERE cache_key = ?", rows)
+        connection.executemany("DELETE FROM cache_tags WHERE cache_key = ?", rows)
+
+    def lookup(self, key):
+        digest = key_digest(key)
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, expires_at, stale_until, last_used FROM cache_entries WHERE cache_key = ?",
+            (digest,),
+        ).fetchone()
+        status = None
+        if row is not None and row[2] > now:
+            # Recency only needs second resolution; skip the write on rapid repeat hits
+            if now - row[3] >= 1.0:
+                connection.execute("UPDATE cache_entries SET last_used = ? WHERE cache_key = ?",
+                                   (now, digest))
+            status = STALE if row[1] <= now else FRESH
+        self._count(status)
+        return status, pickle.loads(row[0]) if status else None
+
+    def set(self, key, value, ttl=None, tables=(), stale_ttl=0.0):
+        """Store a result; results larger than max_bytes are not cached."""
+        payload = pickle.dumps(value, protocol=PICKLE_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        digest = key_digest(key)
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        connection = self._connection()
+        with self._transaction(connection):
+            self._delete(connection, [digest])
+            count, total, next_sweep = connection.execute(
+                "SELECT entries, bytes, next_sweep FROM cache_meta WHERE id = 0"
+            ).fetchone()
+            if now >= next_sweep:
+                self._delete(connection, [row[0] for row in connection.execute(
+                    "SELECT cache_key FROM cache_entries WHERE stale_until <= ?", (now,))])
+                connection.execute("UPDATE cache_meta SET next_sweep = ? WHERE id = 0",
+                                   (now + self.sweep_interval,))
+                count, total = connection.execute(
+                    "SELECT entries, bytes FROM cache_meta WHERE id = 0"
+                ).fetchone()
+            if count + 1 > self.max_entries or total + len(payload) > self.max_bytes:
+                victims = []
+                for victim, size in connection.execute(
+                        "SELECT cache_key, size FROM cache_entries ORDER BY last_used"):
+                    if count + 1 <= self.max_entries and total + len(payload) <= self.max_bytes:
+                        break
+                    victims.append(victim)
+                    count -= 1
+                    total -= size
+                self._delete(connection, victims)
+            connection.execute(
+                "INSERT INTO cache_entries (cache_key, value, size, expires_at, stale_until, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, payload, len(payload), expires_at, expires_at + stale_ttl, now),
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO cache_tags (table_name, cache_key) VALUES (?, ?)",
+                [(table.lower(), digest) for table in tables],
+            )
+
+    def invalidate_tables(self, tables):
+        tables = [table.lower() for table in tables]
+        if not tables:
+            return 0
+        connection = self._connection()
+        with self._transaction(connection):
+            placeholders = ", ".join("?" * len(tables))
+            keys = [row[0] for row in connection.execute(
+                f"SELECT DISTINCT cache_key FROM cache_tags WHERE table_name IN ({placeholders})", tables)]
+            self._delete(connection, keys)
+        return len(keys)
+
+    def clear(self):
+        connection = self._connection()
+        with self._transaction(connection):
+            connection.execute("DELETE FROM cache_entries")
+            connection.execute("DELETE FROM cache_tags")
+
+    def stats(self):
+        """Counts include expired entries that have not been swept yet."""
+        stats = super().stats()
+        count, total = self._connection().execute(
+            "SELECT entries, bytes FROM cache_meta WHERE id = 0"
+        ).fetchone()
+        stats.update({'entries': count, 'bytes': total})
+        return stats
+
+    def close(self):
+        super().close()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+BACKENDS = {
+    "memory": QueryCache,
+    "shm": SharedMemoryBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def make_cache(backend="memory", **options):
+    """Create a cache backend by name: "memory", "shm" or "sqlite"."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown cache backend: {backend}")
+    return BACKENDS[backend](**options)
+
+
+#Build the process-wide cache from QUERY_CACHE_BACKEND (default memory) and QUERY_CACHE_PATH.
+def cache_from_env():
+    backend = os.getenv("QUERY_CACHE_BACKEND", "memory")
+    options = {}
+    if backend != "memory" and os.getenv("QUERY_CACHE_PATH"):
+        options['path'] = os.getenv("QUERY_CACHE_PATH")
+    return make_cache(backend, **options)
+
+
+# Process-wide cache shared by cache_query and transactional
+query_cache = register_backend(cache_from_env())
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its outcome.
+
+    do() makes the first caller for a key the leader, which runs the function,
+    while later callers block until it finishes and receive the same result
+    or exception. do_in_background() starts the call on a daemon thread
+    instead, unless a background call is already running for the key.
+    Background calls are tracked separately, so do() never waits on one and
+    always returns the result of a foreground call.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._background = {}
+        self._lock = threading.Lock()
+
+    def _run(self, calls, key, call, fn):
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+        finally:
+            with self._lock:
+                del calls[key]
+            call.done.set()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if leader:
+            self._run(self._calls, key, call, fn)
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do_in_background(self, key, fn):
+        """Return True if a background call was started, False if one was already running."""
+        with self._lock:
+            if key in self._background:
+                return False
+            call = self._background[key] = _Call()
+        threading.Thread(target=self._run, args=(self._background, key, call, fn), daemon=True).start()
+        return True
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls) + len(self._background)
+
+
+class _WriteTrackingCursor:
+    """Cursor proxy that records the tables touched by write statements."""
+
+    def __init__(self, cursor, written):
+        self._cursor = cursor
+        self._written = written
+
+    def _track(self, query):
+        if is_write(query):
+            self._written.update(tables_in(query))
+
+    def execute(self, query, *args, **kwargs):
+        self._track(query)
+        return self._cursor.execute(query, *args, **kwargs)
+
+    def executemany(self, query, *args, **kwargs):
+        self._track(query)
+        return self._cursor.executemany(query, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    # Special methods are looked up on the type, so __getattr__ does not forward them
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __next__(self):
+        return next(self._cursor)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._cursor.__exit__(*exc_info)
+
+
+class WriteTrackingConnection:
+    """Connection proxy whose cursors record which tables were written."""
+
+    def __init__(self, connection):
+        object.__setattr__(self, "_connection", connection)
+        object.__setattr__(self, "written_tables", set())
+
+    def cursor(self, *args, **kwargs):
+        return _WriteTrackingCursor(self._connection.cursor(*args, **kwargs), self.written_tables)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._connection, name, value)
+
+    def __enter__(self):
+        self._connection.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._connection.__exit__(*exc_info)
@@ -0,0 +1,129 @@
+from dotenv import load_dotenv
+import atexit
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from query_cache import normalize_sql
+
+# Load environment variables from .env file
+load_dotenv()
+
+RECORD_FIELDS = ("timestamp", "function", "sql", "param_count", "wall_ms", "rows", "error")
+
+
+class QueryLogger:
+    """Structured query log written by a background thread.
+
+    record() only appends a tuple to a bounded deque, whose append and
+    popleft are atomic without taking a lock, so the calling thread never
+    waits on I/O. When the buffer is full the oldest record is dropped and
+    counted. A daemon writer wakes every flush_interval seconds, normalizes
+    the SQL and writes one JSON object per record to `sink`. Calls are
+    sampled at sample_rate, but failed calls and calls slower than slow_ms
+    are always kept.
+    """
+
+    def __init__(self, sink=None, capacity=8192, flush_interval=0.5, sample_rate=1.0, slow_ms=None):
+        self.sink = sink or sys.stdout
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self._buffer = deque(maxlen=capacity)
+        self._stop = threading.Event()
+        self._writer = None
+        self._start_lock = threading.Lock()
+        # Best-effort counters, updated without a lock to keep record() cheap
+        self._stats = {
+            'recorded': 0,
+            'sampled_out': 0,
+            'dropped': 0,
+            'written': 0,
+        }
+
+    def keep(self, wall_ms, error):
+        """Decide whether a finished call is logged under the sampling policy."""
+        if error is not None or self.sample_rate >= 1.0:
+            return True
+        if self.slow_ms is not None and wall_ms >= self.slow_ms:
+            return True
+        return random.random() < self.sample_rate
+
+    def record(self, function, query, param_count, wall_ms, rows, error=None):
+        if not self.keep(wall_ms, error):
+            self._stats['sampled_out'] += 1
+            return
+        if self._writer is None:
+            self.start()
+        if len(self._buffer) == self.capacity:
+            self._stats['dropped'] += 1
+        self._buffer.append((time.time(), function, query, param_count, wall_ms, rows, error))
+        self._stats['recorded'] += 1
+
+    def start(self):
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Write every buffered record to the sink; returns how many were written."""
+        lines = []
+        while True:
+            try:
+                timestamp, function, query, param_count, wall_ms, rows, error = self._buffer.popleft()
+            except IndexError:
+                break
+            lines.append(json.dumps(dict(zip(RECORD_FIELDS, (
+                round(timestamp, 6), function, normalize_sql(query) if isinstance(query, str) else None,
+                param_count, round(wall_ms, 3), rows, error,
+            )))))
+        if lines:
+            self.sink.write("\n".join(lines) + "\n")
+            self.sink.flush()
+            self._stats['written'] += len(lines)
+        return len(lines)
+
+    def metrics(self):
+        metrics = dict(self._stats)
+        metrics['buffered'] = len(self._buffer)
+        return metrics
+
+    def close(self):
+        """Stop the writer after it drains the buffer."""
+        self._stop.set()
+        if self._writer is not None and self._writer is not threading.current_thread():
+            self._writer.join()
+        self.flush()
+
+
+# Process-wide logger shared by log_queries, created on first use
+_logger = None
+_logger_lock = threading.Lock()
+
+
+#Return the shared logger, configured from QUERY_LOG_PATH, QUERY_LOG_SAMPLE_RATE and QUERY_LOG_SLOW_MS.
+def get_logger():
+    global _logger
+    if _logger is not None:
+        return _logger
+    with _logger_lock:
+        if _logger is None:
+            path = os.getenv("QUERY_LOG_PATH")
+            slow_ms = os.getenv("QUERY_LOG_SLOW_MS")
+            _logger = QueryLogger(
+                sink=open(path, "a", buffering=1) if path else None,
+                sample_rate=float(os.getenv("QUERY_LOG_SAMPLE_RATE", "1")),
+                slow_ms=float(slow_ms) if slow_ms else None
+            )
+        return _logger
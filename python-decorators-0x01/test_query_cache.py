@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Test query_cache module
+"""
+import os
+import tempfile
+import threading
+import time
+import unittest
+from query_cache import (FRESH, STALE, QueryCache, SharedMemoryBackend, SingleFlight, SQLiteBackend,
+                         WriteTrackingConnection, invalidate_all, make_key, normalize_sql,
+                         register_backend, tables_in)
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test class for SingleFlight request coalescing"""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test concurrent do() calls for a key run the function once"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def load():
+            calls.append(1)
+            release.wait(5)
+            return ["row"]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("key", load)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while not calls:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["row"]] * 5)
+
+    def test_followers_receive_leader_error(self):
+        """Test a follower gets the leader's exception, not None"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fail():
+            started.set()
+            release.wait(5)
+            raise ValueError("boom")
+
+        errors = []
+
+        def call(fn):
+            try:
+                flight.do("key", fn)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call, args=(fail,))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=call, args=(lambda: ["unused"],))
+        follower.start()
+        time.sleep(0.05)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+        self.assertEqual(len(errors), 2)
+        self.assertIs(errors[0], errors[1])
+
+    def test_foreground_call_does_not_wait_on_background_refresh(self):
+        """Test a miss during a stale refresh runs its own query and returns rows"""
+        cache = QueryCache()
+        flight = SingleFlight()
+        key = make_key("SELECT * FROM user_data")
+        cache.set(key, ["old"], ttl=0, tables={"user_data"}, stale_ttl=60)
+        self.assertEqual(cache.lookup(key), (STALE, ["old"]))
+
+        release = threading.Event()
+
+        def refresh():
+            release.wait(5)
+
+        self.assertTrue(flight.do_in_background(key, refresh))
+        self.assertFalse(flight.do_in_background(key, refresh))
+        cache.invalidate_tables({"user_data"})
+        self.assertEqual(cache.lookup(key), (None, None))
+
+        def load():
+            cache.set(key, ["new"], tables={"user_data"})
+            return ["new"]
+
+        try:
+            self.assertEqual(flight.do(key, load), ["new"])
+        finally:
+            release.set()
+        self.assertEqual(cache.lookup(key), (FRESH, ["new"]))
+
+
+class TestNormalizeSql(unittest.TestCase):
+    """Test class for normalize_sql cache-key normalization"""
+
+    def test_keywords_and_whitespace_are_normalized(self):
+        """Test keyword case and whitespace do not change the key"""
+        self.assertEqual(make_key("select *\n  from user_data;"), make_key("SELECT * FROM user_data"))
+
+    def test_identifier_case_is_kept(self):
+        """Test tables differing only in case get different keys"""
+        self.assertNotEqual(make_key("SELECT * FROM Users"), make_key("SELECT * FROM users"))
+        self.assertEqual(normalize_sql("select Name from Users where id = %s"),
+                         "SELECT Name FROM Users WHERE id = %s")
+
+
+class TestTablesIn(unittest.TestCase):
+    """Test class for tables_in table tagging"""
+
+    def test_backtick_identifiers(self):
+        """Test backtick-quoted tables are tagged, schema-qualified or not"""
+        self.assertEqual(tables_in("SELECT * FROM `user_data`"), {"user_data"})
+        self.assertEqual(tables_in("UPDATE `ALX_prodev`.`user_data` SET email = %s"), {"user_data"})
+
+    def test_comma_separated_from_list(self):
+        """Test every table of a comma join is tagged"""
+        self.assertEqual(tables_in("SELECT * FROM user_data u, orders o WHERE u.user_id = o.user_id"),
+                         {"user_data", "orders"})
+
+    def test_string_literals_are_ignored(self):
+        """Test table-like words inside string literals are not tagged"""
+        self.assertEqual(tables_in("DELETE FROM user_data WHERE name = 'FROM orders'"), {"user_data"})
+
+    def test_backtick_write_invalidates_plain_read(self):
+        """Test a backtick UPDATE evicts a cached read of the same table"""
+        cache = QueryCache()
+        read = "SELECT * FROM user_data u, orders o"
+        cache.set(make_key(read), ["row"], tables=tables_in(read))
+        cache.invalidate_tables(tables_in("UPDATE `user_data` SET age = 1"))
+        self.assertEqual(cache.lookup(make_key(read)), (None, None))
+
+
+class TestInvalidateAll(unittest.TestCase):
+    """Test class for invalidation across registered backends"""
+
+    def test_every_registered_backend_is_invalidated(self):
+        """Test a write invalidates a non-default backend too"""
+        cache = register_backend(QueryCache())
+        self.addCleanup(cache.close)
+        cache.set(make_key("SELECT * FROM user_data"), ["row"], tables={"user_data"})
+        invalidate_all({"user_data"})
+        self.assertEqual(len(cache), 0)
+
+    def test_closed_backend_is_unregistered(self):
+        """Test a closed backend is no longer invalidated"""
+        cache = register_backend(QueryCache())
+        cache.set(make_key("SELECT * FROM user_data"), ["row"], tables={"user_data"})
+        cache.close()
+        invalidate_all({"user_data"})
+        self.assertEqual(len(cache), 1)
+
+
+class FakeCursor:
+    """Cursor double supporting iteration and the context manager protocol"""
+
+    def __init__(self):
+        self.rows = iter([(1,), (2,)])
+        self.closed = False
+
+    def execute(self, query, params=()):
+        pass
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+
+
+class FakeConnection:
+    """Connection double handing out FakeCursor objects"""
+
+    def cursor(self):
+        self.last_cursor = FakeCursor()
+        return self.last_cursor
+
+
+class TestWriteTrackingConnection(unittest.TestCase):
+    """Test class for the connection proxy used by transactional"""
+
+    def test_cursor_context_manager_tracks_writes(self):
+        """Test `with conn.cursor() as c` works and records written tables"""
+        connection = FakeConnection()
+        tracked = WriteTrackingConnection(connection)
+        with tracked.cursor() as cursor:
+            cursor.execute("UPDATE `user_data` SET age = %s", (30,))
+            self.assertEqual(next(cursor), (1,))
+            self.assertEqual(list(cursor), [(2,)])
+        self.assertTrue(connection.last_cursor.closed)
+        self.assertEqual(tracked.written_tables, {"user_data"})
+
+
+class TestSharedMemoryBackend(unittest.TestCase):
+    """Test class for the memory-mapped cache backend"""
+
+    def setUp(self):
+        """Use a fresh cache file for each test"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.mmap")
+
+    def test_mismatched_geometry_is_refused(self):
+        """Test a different geometry raises instead of resizing a live file"""
+        cache = SharedMemoryBackend(path=self.path, max_entries=64, slot_size=1024)
+        self.addCleanup(cache.close)
+        cache.set(("key",), ["row"])
+        size = os.path.getsize(self.path)
+        with self.assertRaises(ValueError):
+            SharedMemoryBackend(path=self.path, max_entries=16, slot_size=1024)
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertEqual(cache.lookup(("key",)), (FRESH, ["row"]))
+
+    def test_file_writable_by_others_is_refused(self):
+        """Test a cache file open to other users is never mapped and unpickled"""
+        fd = os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600)
+        os.close(fd)
+        os.chmod(self.path, 0o666)
+        with self.assertRaises(PermissionError):
+            SharedMemoryBackend(path=self.path, max_entries=16, slot_size=1024)
+        with self.assertRaises(PermissionError):
+            SQLiteBackend(path=self.path)
+
+    def test_symlinked_file_is_refused(self):
+        """Test a symlink planted at the cache path is not followed"""
+        target = self.path + ".target"
+        os.symlink(target, self.path)
+        with self.assertRaises(OSError):
+            SharedMemoryBackend(path=self.path, max_entries=16, slot_size=1024)
+        self.assertFalse(os.path.exists(target))
+
+
+if __name__ == "__main__":
+    unittest.main()
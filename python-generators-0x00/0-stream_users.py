@@ -3,13 +3,27 @@ from mysql.connector import Error
 from dotenv import load_dotenv
 import os
 from itertools import islice
+from rows import row_maker
 
 # Load environment variables from .env file
 load_dotenv()
 
 
 #Generator to stream rows one by one from the user_data table.
-def stream_users():
+def stream_users(fetch_size=1000, row_factory=None):
+    """Stream user_data rows over an unbuffered cursor, fetch_size rows at a time.
+
+    Rows are dicts by default. row_factory="record" (__slots__ objects) or
+    "namedtuple" yields compact rows that share their field names per class
+    and still support row['age'] as well as row.age.
+
+    The result set is read from the socket as it is consumed (mysql_use_result
+    semantics), so peak client memory is bounded by one fetchmany() batch of
+    fetch_size rows plus the driver's packet buffer, independent of table size.
+    Keep the connection dedicated to this stream until the generator is done.
+    """
+    connection = None
+    exhausted = False
     try:
         # Connect to the ALX_prodev database
         connection = mysql.connector.connect(
@@ -19,12 +33,14 @@ def stream_users():
             database=os.getenv("MYSQL_DATABASE")
         )
         if connection.is_connected():
-            cursor = connection.cursor(dictionary=True)  
+            cursor = connection.cursor(dictionary=row_factory is None, buffered=False)
             cursor.execute("SELECT * FROM user_data")
-            
-            # Single loop to fetch and yield each row
-            for row in cursor:
-                yield row
+            make_row = row_maker(cursor.column_names, row_factory) if row_factory else None
+
+            # Single loop to fetch bounded batches and yield each row
+            for rows in iter(lambda: cursor.fetchmany(fetch_size), []):
+                yield from (rows if make_row is None else map(make_row, rows))
+            exhausted = True
 
             cursor.close()
             connection.close()
@@ -32,6 +48,11 @@ def stream_users():
     except Error as e:
         print(f"Error streaming data from database: {e}")
         return
+    finally:
+        # A consumer that stops early leaves unread rows on the wire;
+        # drop the socket instead of draining the rest of the table.
+        if connection is not None and not exhausted:
+            connection.shutdown()
 
 #Demonstrate streaming users from the database with a limit of 6 rows
 def main():
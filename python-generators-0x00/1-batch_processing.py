@@ -3,12 +3,19 @@ from mysql.connector import Error
 from dotenv import load_dotenv
 import os
 import sys
+import time
+from pushdown import compile_select
+from columnar import stream_columnar_batches
+from prefetch import prefetch
+from rows import row_maker
 
 # Load environment variables from .env file
 load_dotenv()
 
 #Generator to fetch rows from user_data table in batches.
-def stream_users_in_batches(batch_size):
+#Optional (column, operator, value) filters are compiled into the SQL WHERE clause.
+#row_factory="record" or "namedtuple" yields compact rows instead of dicts.
+def stream_users_in_batches(batch_size, filters=None, row_factory=None):
     try:
         # Connect to the ALX_prodev database
         connection = mysql.connector.connect(
@@ -18,13 +25,14 @@ def stream_users_in_batches(batch_size):
             database=os.getenv("MYSQL_DATABASE")
         )
         if connection.is_connected():
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM user_data")
+            cursor = connection.cursor(dictionary=row_factory is None)
+            cursor.execute(*compile_select(filters=filters))
+            make_row = row_maker(cursor.column_names, row_factory) if row_factory else None
             
             # Loop 1: Fetch rows and accumulate into batches
             batch = []
             for row in cursor:
-                batch.append(row)
+                batch.append(row if make_row is None else make_row(row))
                 if len(batch) == batch_size:
                     yield batch
                     batch = []
@@ -41,10 +49,91 @@ def stream_users_in_batches(batch_size):
         return
 
 
+#Estimate the in-memory size of a dict row in bytes.
+def row_bytes(row):
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+
+
+#Choose the next batch size from the last batch's fetch latency and row size.
+def next_batch_size(size, latency, bytes_per_row, target_latency, memory_budget_bytes,
+                    min_size, max_size):
+    if latency > 0:
+        # Move toward the target latency, at most halving or doubling per batch
+        size = int(size * min(max(target_latency / latency, 0.5), 2.0))
+    if memory_budget_bytes and bytes_per_row:
+        size = min(size, memory_budget_bytes // bytes_per_row)
+    return max(min_size, min(size, max_size))
+
+
+#Generator to fetch batches whose size adapts to a target fetch latency and memory budget.
+def stream_users_in_adaptive_batches(initial_size=1000, target_latency=0.05,
+                                     memory_budget_bytes=None, min_size=100,
+                                     max_size=100000, filters=None, on_batch=None):
+    """Yield batches of user rows, resizing each fetch from the previous one.
+
+    After every fetchmany() the size is scaled by target_latency / latency
+    (clamped to halve or double at most) and capped so that a batch stays
+    within memory_budget_bytes. on_batch, if given, is called with a stats
+    dict holding the batch number, requested size, rows, latency,
+    bytes_per_row and next_size.
+    """
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv("MYSQL_HOST"),
+            user=os.getenv("MYSQL_USER"),
+            password=os.getenv("MYSQL_PASSWORD"),
+            database=os.getenv("MYSQL_DATABASE")
+        )
+        if connection.is_connected():
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            cursor.execute(*compile_select(filters=filters))
+
+            size = max(min_size, min(initial_size, max_size))
+            number = 0
+            while True:
+                start = time.perf_counter()
+                batch = cursor.fetchmany(size)
+                latency = time.perf_counter() - start
+                if not batch:
+                    break
+                sample = batch[::max(len(batch) // 16, 1)]
+                bytes_per_row = sum(row_bytes(row) for row in sample) // len(sample)
+                chosen = next_batch_size(size, latency, bytes_per_row, target_latency,
+                                         memory_budget_bytes, min_size, max_size)
+                number += 1
+                if on_batch is not None:
+                    on_batch({
+                        'batch': number,
+                        'size': size,
+                        'rows': len(batch),
+                        'latency': latency,
+                        'bytes_per_row': bytes_per_row,
+                        'next_size': chosen,
+                    })
+                size = chosen
+                yield batch
+
+            cursor.close()
+            connection.close()
+
+    except Error as e:
+        print(f"Error fetching data from database: {e}")
+        return
+
+
+#Generator to fetch batches while the next buffer_size batches are fetched in the background.
+def stream_users_in_batches_prefetched(batch_size, filters=None, buffer_size=2):
+    return prefetch(stream_users_in_batches(batch_size, filters), buffer_size)
+
+
 #Process batches to filter users over the age of 25.
-def batch_processing(batch_size):
+#By default every row is fetched and filtered here, as the task requires; pushdown=True runs the filter in SQL.
+def batch_processing(batch_size, pushdown=False, row_factory=None):
+    if pushdown:
+        yield from stream_users_in_batches(batch_size, filters=[("age", ">", 25)], row_factory=row_factory)
+        return
     # Loop 2: Iterate over batches from the generator
-    for batch in stream_users_in_batches(batch_size):
+    for batch in stream_users_in_batches(batch_size, row_factory=row_factory):
         # Loop 3: Filter users in the batch with age > 25
         filtered_batch = [user for user in batch if user['age'] > 25]
         if filtered_batch:  # Only yield if the filtered batch is not empty
@@ -52,6 +141,15 @@ def batch_processing(batch_size):
 
 
 
+#Process columnar batches to filter users over the age of 25 with a vectorized mask.
+def batch_processing_columnar(batch_size):
+    for batch in stream_columnar_batches(batch_size):
+        filtered_batch = batch.filter(batch.age > 25)
+        if len(filtered_batch):
+            yield filtered_batch
+
+
+
 #Demonstrate batch processing with a batch size of 50.
 def main():
     try:
@@ -1,7 +1,10 @@
 import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
+import base64
+import json
 import os
+from prefetch import prefetch
 
 # Load environment variables from .env file
 load_dotenv()
@@ -40,6 +43,89 @@ def lazy_paginate(page_size):
         offset += page_size
 
 
+#Generator to lazily load pages while the next buffer_size pages are fetched in the background.
+def lazy_paginate_prefetched(page_size, buffer_size=2):
+    return prefetch(lazy_paginate(page_size), buffer_size)
+
+
+# Indexed columns that may be used as a keyset; user_id always breaks ties.
+# idx_email is a secondary index, so InnoDB already stores (email, user_id) in it.
+KEYSET_COLUMNS = ("user_id", "email")
+
+
+#Encode the position after the last row of a page as an opaque resume cursor.
+def encode_cursor(key, row):
+    position = [key, str(row[key]), row["user_id"]]
+    return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+
+#Decode a resume cursor produced by encode_cursor.
+def decode_cursor(resume_cursor, key):
+    try:
+        cursor_key, last_value, last_user_id = json.loads(base64.urlsafe_b64decode(resume_cursor))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid resume cursor: {e}")
+    if cursor_key != key:
+        raise ValueError(f"Resume cursor was issued for key {cursor_key!r}, not {key!r}")
+    return last_value, last_user_id
+
+
+#Fetch the page of users that follows a keyset position on an open connection.
+def paginate_users_keyset(connection, page_size, key="user_id", after=None):
+    if key not in KEYSET_COLUMNS:
+        raise ValueError(f"Unsupported keyset column: {key}")
+    order = "user_id" if key == "user_id" else f"{key}, user_id"
+    cursor = connection.cursor(dictionary=True)
+    if after is None:
+        cursor.execute(f"SELECT * FROM user_data ORDER BY {order} LIMIT %s", (page_size,))
+    elif key == "user_id":
+        cursor.execute(
+            "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s",
+            (after[1], page_size)
+        )
+    else:
+        cursor.execute(
+            f"SELECT * FROM user_data WHERE ({key}, user_id) > (%s, %s) ORDER BY {order} LIMIT %s",
+            (after[0], after[1], page_size)
+        )
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+#Generator to lazily load pages by seeking past the last row instead of using OFFSET.
+def lazy_paginate_keyset(page_size, key="user_id", resume_cursor=None):
+    """Yield (page, resume_cursor) tuples over a single connection.
+
+    Each page is fetched with WHERE (key, user_id) > last seen ORDER BY key LIMIT
+    page_size. `key` must be one of KEYSET_COLUMNS, which are all indexed, so
+    the cost of a page does not depend on its depth. Pass a yielded resume_cursor back in to continue after that page.
+    """
+    after = decode_cursor(resume_cursor, key) if resume_cursor else None
+    connection = None
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv("MYSQL_HOST"),
+            user=os.getenv("MYSQL_USER"),
+            password=os.getenv("MYSQL_PASSWORD"),
+            database=os.getenv("MYSQL_DATABASE")
+        )
+        # Loop 1: Seek to each following page until one comes back empty
+        while True:
+            page = paginate_users_keyset(connection, page_size, key, after)
+            if not page:
+                break
+            resume_cursor = encode_cursor(key, page[-1])
+            yield page, resume_cursor
+            after = (str(page[-1][key]), page[-1]["user_id"])
+    except Error as e:
+        print(f"Error fetching page from database: {e}")
+        return
+    finally:
+        if connection is not None and connection.is_connected():
+            connection.close()
+
+
 #Demonstrate lazy pagination with a page size of 5.
 def main():
     print("Lazy loading paginated users:")
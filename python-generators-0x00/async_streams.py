@@ -0,0 +1,166 @@
+import aiomysql
+import asyncio
+from contextlib import aclosing
+from dotenv import load_dotenv
+import os
+from pushdown import compile_select
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Task creating the shared connection pool, started on first use by the running event loop
+_pool_task = None
+
+
+async def get_pool(minsize=1, maxsize=20):
+    """Return the shared aiomysql pool, creating it on first use.
+
+    Concurrent first callers all await the same creation task, so only one
+    pool is ever opened. The pool belongs to the event loop that created it;
+    call close_pool() before that loop shuts down.
+    """
+    global _pool_task
+    if _pool_task is None:
+        _pool_task = asyncio.ensure_future(aiomysql.create_pool(
+            host=os.getenv("MYSQL_HOST"),
+            user=os.getenv("MYSQL_USER"),
+            password=os.getenv("MYSQL_PASSWORD"),
+            db=os.getenv("MYSQL_DATABASE"),
+            minsize=minsize,
+            maxsize=maxsize,
+            autocommit=True
+        ))
+    task = _pool_task
+    try:
+        # Shielded so one cancelled caller does not abort creation for the others
+        return await asyncio.shield(task)
+    except Exception:
+        if _pool_task is task and task.done():
+            _pool_task = None  # Let the next caller retry a failed creation
+        raise
+
+
+async def close_pool():
+    """Close the shared pool and wait for its connections to finish."""
+    global _pool_task
+    if _pool_task is not None:
+        task, _pool_task = _pool_task, None
+        try:
+            pool = await task
+        except Exception:
+            return
+        pool.close()
+        await pool.wait_closed()
+
+
+async def _stream_query(query, params=(), fetch_size=1000, cursor_class=aiomysql.SSDictCursor):
+    """Async generator yielding lists of up to fetch_size rows from an unbuffered cursor.
+
+    A consumer that stops early closes the connection instead of draining the
+    rest of the result set; the pool then replaces it.
+    """
+    pool = await get_pool()
+    connection = await pool.acquire()
+    exhausted = False
+    try:
+        cursor = await connection.cursor(cursor_class)
+        await cursor.execute(query, params)
+        while True:
+            rows = await cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield rows
+        exhausted = True
+        await cursor.close()
+    finally:
+        if not exhausted:
+            connection.close()
+        pool.release(connection)
+
+
+#Async generator to stream rows one by one from the user_data table.
+async def stream_users(fetch_size=1000):
+    async with aclosing(_stream_query("SELECT * FROM user_data", fetch_size=fetch_size)) as batches:
+        async for rows in batches:
+            for row in rows:
+                yield row
+
+
+#Async generator to fetch rows from the user_data table in batches.
+async def stream_users_in_batches(batch_size, filters=None):
+    query, params = compile_select(filters=filters)
+    async with aclosing(_stream_query(query, params, fetch_size=batch_size)) as batches:
+        async for batch in batches:
+            yield batch
+
+
+#Process batches to filter users over the age of 25 in SQL.
+async def batch_processing(batch_size):
+    async with aclosing(stream_users_in_batches(batch_size, filters=[("age", ">", 25)])) as batches:
+        async for batch in batches:
+            yield batch
+
+
+#Fetch a page of users from the user_data table.
+async def paginate_users(page_size, offset):
+    pool = await get_pool()
+    async with pool.acquire() as connection:
+        async with connection.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute("SELECT * FROM user_data LIMIT %s OFFSET %s", (page_size, offset))
+            return await cursor.fetchall()
+
+
+#Async generator to lazily load paginated users from the user_data table.
+async def lazy_paginate(page_size):
+    offset = 0
+    while True:
+        page = await paginate_users(page_size, offset)
+        if not page:
+            break
+        yield page
+        offset += page_size
+
+
+#Async generator to stream user ages one by one from the user_data table.
+async def stream_user_ages(fetch_size=1000):
+    query = _stream_query("SELECT age FROM user_data", fetch_size=fetch_size,
+                          cursor_class=aiomysql.SSCursor)
+    async with aclosing(query) as batches:
+        async for rows in batches:
+            for (age,) in rows:
+                yield float(age)
+
+
+#Calculate the average age using the stream_user_ages async generator.
+async def calculate_average_age():
+    total = 0
+    count = 0
+    async for age in stream_user_ages():
+        total += age
+        count += 1
+    if count == 0:
+        return 0
+    return total / count
+
+
+#Demonstrate several streams sharing one pool concurrently.
+async def main():
+    try:
+        async def first_users(limit):
+            users = []
+            async with aclosing(stream_users()) as stream:
+                async for user in stream:
+                    users.append(user)
+                    if len(users) == limit:
+                        break
+            return users
+
+        users, average_age = await asyncio.gather(first_users(6), calculate_average_age())
+        for user in users:
+            print(user)
+        print(f"Average age of users: {average_age:.2f}")
+    finally:
+        await close_pool()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,376 @@
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+from itertools import islice
+from multiprocessing import get_context
+
+import mysql.connector
+
+ROW_GENERATOR_CHUNK = 1000  # Rows per timed unit for generators that yield single rows
+BATCH_SIZE = 1000
+
+
+class SQLiteCursor:
+    """mysql-connector style cursor over sqlite3, enough for the generator scripts."""
+
+    def __init__(self, connection, dictionary):
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+
+    @staticmethod
+    def _translate(query):
+        return query.replace("%s", "?").replace("INSERT IGNORE", "INSERT OR IGNORE")
+
+    @staticmethod
+    def _params(params):
+        return [float(value) if isinstance(value, Decimal) else value for value in params or ()]
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip((column[0] for column in self._cursor.description), row))
+
+    def execute(self, query, params=()):
+        SQLiteConnection.round_trips += 1
+        self._cursor.execute(self._translate(query), self._params(params))
+
+    def executemany(self, query, seq_params):
+        SQLiteConnection.round_trips += 1
+        self._cursor.executemany(self._translate(query), [self._params(params) for params in seq_params])
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return (self._row(row) for row in self._cursor)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """mysql-connector style connection over sqlite3 that counts statements as round trips."""
+
+    round_trips = 0  # Statements executed by every connection in this process
+
+    def __init__(self, path):
+        self.raw = sqlite3.connect(path, check_same_thread=False)
+
+    def cursor(self, dictionary=False, buffered=None):
+        return SQLiteCursor(self, dictionary)
+
+    def is_connected(self):
+        return True
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        self.raw.close()
+
+    shutdown = close
+
+
+#Install the SQLite stand-in in place of mysql.connector.connect for this process.
+def use_sqlite(path):
+    mysql.connector.connect = lambda **kwargs: SQLiteConnection(path)
+
+
+#Read the server-wide statement counter used to estimate MySQL round trips.
+def mysql_questions():
+    connection = mysql.connector.connect(
+        host=os.getenv("MYSQL_HOST"),
+        user=os.getenv("MYSQL_USER"),
+        password=os.getenv("MYSQL_PASSWORD")
+    )
+    cursor = connection.cursor()
+    cursor.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+    (_, questions) = cursor.fetchone()
+    cursor.close()
+    connection.close()
+    return int(questions)
+
+
+#Write a synthetic user_data CSV with the same columns as user_data.csv.
+def write_synthetic_csv(path, rows, seed=0):
+    generator = random.Random(seed)
+    with open(path, mode='w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file, quoting=csv.QUOTE_ALL)
+        writer.writerow(("name", "email", "age"))
+        for index in range(rows):
+            writer.writerow((f"User {index}", f"user{index}@example.com", generator.randint(18, 99)))
+
+
+#Create an empty user_data table in the benchmark database.
+def reset_table(backend, sqlite_path):
+    if backend == "sqlite":
+        connection = sqlite3.connect(sqlite_path)
+        connection.execute("DROP TABLE IF EXISTS user_data")
+        connection.execute("""
+        CREATE TABLE user_data (
+            user_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            age REAL NOT NULL,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        connection.commit()
+        connection.close()
+        return
+
+    seed = __import__('seed')
+    connection = seed.connect_db()
+    cursor = connection.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{os.environ['MYSQL_DATABASE']}`")
+    cursor.close()
+    connection.close()
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor()
+    cursor.execute("DROP TABLE IF EXISTS user_data")
+    cursor.close()
+    seed.create_table(connection)
+    connection.close()
+
+
+#Generator to group single rows into timed units.
+def chunked(rows, size=ROW_GENERATOR_CHUNK):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+#Generator that passes rows through while timing every `every` rows pulled.
+def probe(rows, latencies, every=BATCH_SIZE):
+    last = time.perf_counter()
+    for count, row in enumerate(rows, start=1):
+        yield row
+        if count % every == 0:
+            now = time.perf_counter()
+            latencies.append(now - last)
+            last = now
+
+
+# Scripts under test, imported before timing starts
+MODULES = ("seed", "0-stream_users", "1-batch_processing", "2-lazy_paginate", "4-stream_ages")
+
+
+#Seed cases load the CSV into user_data; read cases return an iterable of row lists.
+def case_seed_rows(csv_path, latencies):
+    seed = __import__('seed')
+    connection = seed.connect_to_prodev()
+    seed.insert_data(connection, probe(seed.csv_reader_generator(csv_path), latencies))
+    connection.close()
+
+
+def case_seed_bulk(csv_path, latencies):
+    seed = __import__('seed')
+    connection = seed.connect_to_prodev()
+    seed.insert_data_bulk(connection, probe(seed.csv_reader_generator(csv_path), latencies), BATCH_SIZE)
+    connection.close()
+
+
+def case_stream_users():
+    return chunked(__import__('0-stream_users').stream_users(BATCH_SIZE))
+
+
+def case_stream_users_record():
+    return chunked(__import__('0-stream_users').stream_users(BATCH_SIZE, row_factory="record"))
+
+
+def case_stream_users_in_batches():
+    return __import__('1-batch_processing').stream_users_in_batches(BATCH_SIZE)
+
+
+def case_batch_processing():
+    return __import__('1-batch_processing').batch_processing(BATCH_SIZE, pushdown=True)
+
+
+def case_batch_processing_python():
+    return __import__('1-batch_processing').batch_processing(BATCH_SIZE, pushdown=False)
+
+
+def case_lazy_paginate():
+    return __import__('2-lazy_paginate').lazy_paginate(BATCH_SIZE)
+
+
+def case_lazy_paginate_keyset():
+    return (page for page, _ in __import__('2-lazy_paginate').lazy_paginate_keyset(BATCH_SIZE))
+
+
+def case_stream_user_ages():
+    return chunked(__import__('4-stream_ages').stream_user_ages())
+
+
+SEED_CASES = {
+    "seed_rows": case_seed_rows,
+    "seed_bulk": case_seed_bulk,
+}
+
+READ_CASES = {
+    "stream_users": case_stream_users,
+    "stream_users_record": case_stream_users_record,
+    "stream_users_in_batches": case_stream_users_in_batches,
+    "batch_processing": case_batch_processing,
+    "batch_processing_python": case_batch_processing_python,
+    "lazy_paginate": case_lazy_paginate,
+    "lazy_paginate_keyset": case_lazy_paginate_keyset,
+    "stream_user_ages": case_stream_user_ages,
+}
+
+
+#Return the nearest-rank percentile of a list of seconds, in milliseconds.
+def percentile_ms(values, percent):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(percent / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)] * 1000
+
+
+#Run one case in the current (fresh) process and return its measurements.
+def run_case(backend, sqlite_path, name, rows, csv_path, time_limit):
+    if backend == "sqlite":
+        use_sqlite(sqlite_path)
+    else:
+        questions_before = mysql_questions()
+
+    for module in MODULES:
+        __import__(module)
+    latencies = []
+    processed = 0
+    truncated = False
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        if name in SEED_CASES:
+            SEED_CASES[name](csv_path, latencies)
+            processed = rows
+        else:
+            units = READ_CASES[name]()
+            last = start
+            for unit in units:
+                now = time.perf_counter()
+                latencies.append(now - last)
+                last = now
+                processed += len(unit)
+                if now - start > time_limit:
+                    truncated = True
+                    units.close()
+                    break
+        elapsed = time.perf_counter() - start
+
+    if backend == "sqlite":
+        round_trips = SQLiteConnection.round_trips
+    else:
+        round_trips = mysql_questions() - questions_before - 1  # The second status query counts itself
+    return {
+        'case': name,
+        'table_rows': rows,
+        'rows_processed': processed,
+        'seconds': elapsed,
+        'rows_per_sec': processed / elapsed if elapsed > 0 else None,
+        'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'round_trips': round_trips,
+        'batch_latency_ms': {'p50': percentile_ms(latencies, 50), 'p99': percentile_ms(latencies, 99)},
+        'truncated': truncated,
+    }
+
+
+#Run a case in a spawned process so peak RSS and driver state are per case.
+def run_isolated(*args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(run_case, *args).result()
+
+
+#Seed and benchmark every case at each table size.
+def run_benchmarks(backend, sizes, cases, workdir, time_limit, max_row_insert_rows):
+    results = []
+    for rows in sizes:
+        csv_path = os.path.join(workdir, f"user_data_{rows}.csv")
+        sqlite_path = os.path.join(workdir, f"user_data_{rows}.sqlite")
+        write_synthetic_csv(csv_path, rows)
+        print(f"== {rows} rows", file=sys.stderr)
+
+        if "seed_rows" in cases and rows <= max_row_insert_rows:
+            reset_table(backend, sqlite_path)
+            results.append(run_isolated(backend, sqlite_path, "seed_rows", rows, csv_path, time_limit))
+            print(f"  seed_rows: {results[-1]['rows_per_sec']:.0f} rows/sec", file=sys.stderr)
+
+        # seed_bulk always runs: it also seeds the table for the read cases
+        reset_table(backend, sqlite_path)
+        results.append(run_isolated(backend, sqlite_path, "seed_bulk", rows, csv_path, time_limit))
+        print(f"  seed_bulk: {results[-1]['rows_per_sec']:.0f} rows/sec", file=sys.stderr)
+
+        for name in READ_CASES:
+            if name in cases:
+                results.append(run_isolated(backend, sqlite_path, name, rows, csv_path, time_limit))
+                print(f"  {name}: {results[-1]['rows_per_sec'] or 0:.0f} rows/sec", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the user_data generators and seeders.")
+    parser.add_argument("--backend", choices=("mysql", "sqlite"), default="sqlite")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 1000000, 10000000])
+    parser.add_argument("--cases", nargs="+", default=list(SEED_CASES) + list(READ_CASES),
+                        choices=list(SEED_CASES) + list(READ_CASES))
+    parser.add_argument("--database", default="ALX_prodev_bench",
+                        help="MySQL database to seed; never the real ALX_prodev data")
+    parser.add_argument("--time-limit", type=float, default=60.0,
+                        help="Seconds after which a read case stops and is marked truncated")
+    parser.add_argument("--max-row-insert-rows", type=int, default=10000,
+                        help="Largest table size at which the row-by-row seed_rows case runs")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+    if args.backend == "mysql" and args.database == "ALX_prodev":
+        parser.error("--database must not be ALX_prodev: the benchmark drops user_data")
+
+    os.environ["MYSQL_DATABASE"] = args.database  # Inherited by the spawned case processes
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run_benchmarks(args.backend, args.rows, args.cases, workdir,
+                                 args.time_limit, args.max_row_insert_rows)
+
+    report = {
+        'backend': args.backend,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, mode='w', encoding='utf-8') as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
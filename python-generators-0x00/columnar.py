@@ -0,0 +1,156 @@
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+import os
+from pushdown import compile_select
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the columnar batch mode
+    np = None
+
+# Load environment variables from .env file
+load_dotenv()
+
+USER_COLUMNS = ("user_id", "name", "email", "age")
+
+
+#Raise a clear error when the columnar mode is used without numpy installed.
+def require_numpy():
+    if np is None:
+        raise ImportError("Columnar batches require numpy: pip install numpy")
+
+
+class StringColumn:
+    """Arrow-style string column: one UTF-8 buffer plus an offsets array.
+
+    Value i is data[offsets[i]:offsets[i + 1]], so a batch of strings costs
+    one buffer and one int64 array instead of a str object per row. `data` is
+    bytes when built from values and a uint8 array when gathered from
+    another column.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_values(cls, values):
+        require_numpy()
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(offsets, b"".join(encoded))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return bytes(self.data[self.offsets[index]:self.offsets[index + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def _gathered(self, lengths, byte_selector):
+        # The new buffer stays a uint8 array: copying it back into bytes would cost another pass
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return StringColumn(offsets, np.frombuffer(self.data, dtype=np.uint8)[byte_selector])
+
+    def take(self, indices):
+        """Return a new column holding only the values at `indices`.
+
+        The gather is one fancy index over the raw buffer; no string is decoded.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        lengths = np.diff(self.offsets)[indices]
+        starts = self.offsets[:-1][indices]
+        # Byte j of value k sits at starts[k] + j, i.e. new offset plus a per-value shift
+        shifts = starts - (np.cumsum(lengths) - lengths)
+        return self._gathered(lengths, np.repeat(shifts, lengths) + np.arange(lengths.sum()))
+
+    def compress(self, mask):
+        """Return a new column holding only the values where the boolean `mask` is true.
+
+        Cheaper than take() for filters: the row mask is widened to a byte mask
+        instead of building an int64 position per byte.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        lengths = np.diff(self.offsets)
+        return self._gathered(lengths[mask], np.repeat(mask, lengths))
+
+
+class ColumnarBatch:
+    """Struct-of-arrays batch of user_data rows.
+
+    `age` is a float64 array and `user_id` a fixed-width 36-byte array, so
+    filters and statistics can run vectorized; `name` and `email` are
+    StringColumn buffers.
+    """
+
+    def __init__(self, user_id, name, email, age):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.age = age
+
+    @classmethod
+    def from_rows(cls, rows):
+        require_numpy()
+        user_ids, names, emails, ages = zip(*rows) if rows else ((), (), (), ())
+        return cls(
+            np.array(user_ids, dtype="S36"),
+            StringColumn.from_values(names),
+            StringColumn.from_values(emails),
+            np.array(ages, dtype=np.float64),
+        )
+
+    def __len__(self):
+        return len(self.age)
+
+    def filter(self, mask):
+        """Return a new batch with the rows where the boolean `mask` is true."""
+        mask = np.asarray(mask, dtype=bool)
+        return ColumnarBatch(
+            self.user_id[mask],
+            self.name.compress(mask),
+            self.email.compress(mask),
+            self.age[mask],
+        )
+
+    def rows(self):
+        """Yield the batch as dict rows, for callers that expect the row format."""
+        for index in range(len(self)):
+            yield {
+                'user_id': self.user_id[index].decode("ascii"),
+                'name': self.name[index],
+                'email': self.email[index],
+                'age': float(self.age[index]),
+            }
+
+
+#Generator to fetch user_data in struct-of-arrays batches instead of lists of dicts.
+def stream_columnar_batches(batch_size, filters=None):
+    require_numpy()
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv("MYSQL_HOST"),
+            user=os.getenv("MYSQL_USER"),
+            password=os.getenv("MYSQL_PASSWORD"),
+            database=os.getenv("MYSQL_DATABASE")
+        )
+        if connection.is_connected():
+            # Plain tuple rows: no per-row dict is built before the batch is packed
+            cursor = connection.cursor()
+            cursor.execute(*compile_select(USER_COLUMNS, filters))
+
+            for rows in iter(lambda: cursor.fetchmany(batch_size), []):
+                yield ColumnarBatch.from_rows(rows)
+
+            cursor.close()
+            connection.close()
+
+    except Error as e:
+        print(f"Error fetching columnar batches from database: {e}")
+        return
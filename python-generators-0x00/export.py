@@ -0,0 +1,181 @@
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+import os
+import sys
+from pushdown import compile_select
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for columnar export
+    pa = None
+
+# Load environment variables from .env file
+load_dotenv()
+
+USER_COLUMNS = ("user_id", "name", "email", "age")
+FORMATS = ("parquet", "arrow")
+# Arrow IPC stays uncompressed by default so memory-mapped reads are zero-copy
+DEFAULT_COMPRESSION = {"parquet": "zstd", "arrow": "none"}
+
+
+#Raise a clear error when export is used without pyarrow installed.
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar export requires pyarrow: pip install pyarrow")
+
+
+#Arrow schema of an exported user_data file; age is float64 so analytics can vectorize it.
+def user_schema():
+    require_pyarrow()
+    return pa.schema([
+        ("user_id", pa.string()),
+        ("name", pa.string()),
+        ("email", pa.string()),
+        ("age", pa.float64()),
+    ])
+
+
+#Convert a list of (user_id, name, email, age) tuples into an Arrow record batch.
+def to_record_batch(rows, schema):
+    user_ids, names, emails, ages = zip(*rows)
+    return pa.record_batch([
+        pa.array(user_ids, pa.string()),
+        pa.array(names, pa.string()),
+        pa.array(emails, pa.string()),
+        pa.array([float(age) for age in ages], pa.float64()),
+    ], schema=schema)
+
+
+#Generator to stream user_data from MySQL as Arrow record batches.
+def stream_record_batches(fetch_size=10000, filters=None):
+    schema = user_schema()
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv("MYSQL_HOST"),
+            user=os.getenv("MYSQL_USER"),
+            password=os.getenv("MYSQL_PASSWORD"),
+            database=os.getenv("MYSQL_DATABASE")
+        )
+        if connection.is_connected():
+            cursor = connection.cursor(buffered=False)
+            cursor.execute(*compile_select(USER_COLUMNS, filters))
+
+            for rows in iter(lambda: cursor.fetchmany(fetch_size), []):
+                yield to_record_batch(rows, schema)
+
+            cursor.close()
+            connection.close()
+
+    except Error as e:
+        print(f"Error exporting data from database: {e}")
+        return
+
+
+#Write record batches to a Parquet or Arrow IPC file with row groups sized to a memory budget.
+def write_batches(batches, path, file_format="parquet", compression=None,
+                  memory_limit_bytes=64 * 1024 * 1024, row_group_rows=None):
+    """Write batches to `path` and return the number of rows written.
+
+    Batches are buffered until a row group is full, so at most one row group
+    is held in memory. Unless row_group_rows is given, its size is
+    memory_limit_bytes divided by the bytes per row of the first batch.
+    compression defaults to zstd for Parquet and none for Arrow IPC; a
+    compressed IPC file is decompressed onto the heap when read.
+    """
+    require_pyarrow()
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    compression = compression or DEFAULT_COMPRESSION[file_format]
+    schema = user_schema()
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(path, schema, compression=compression)
+        write_group = lambda table: writer.write_table(table, row_group_size=len(table))
+    else:
+        options = ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+        writer = ipc.new_file(path, schema, options=options)
+        write_group = writer.write_table
+
+    pending = []
+    pending_rows = 0
+    total = 0
+    try:
+        for batch in batches:
+            if row_group_rows is None and batch.num_rows:
+                row_group_rows = max(memory_limit_bytes // max(batch.nbytes // batch.num_rows, 1), 1)
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= row_group_rows:
+                table = pa.Table.from_batches(pending, schema)
+                for offset in range(0, table.num_rows - row_group_rows + 1, row_group_rows):
+                    write_group(table.slice(offset, row_group_rows))
+                    total += row_group_rows
+                remainder = table.num_rows % row_group_rows
+                pending = table.slice(table.num_rows - remainder).to_batches() if remainder else []
+                pending_rows = remainder
+        if pending_rows:
+            write_group(pa.Table.from_batches(pending, schema))
+            total += pending_rows
+    finally:
+        writer.close()
+    return total
+
+
+#Export user_data straight from MySQL to a columnar file.
+def export_users(path, file_format="parquet", compression=None,
+                 memory_limit_bytes=64 * 1024 * 1024, fetch_size=10000, filters=None):
+    return write_batches(stream_record_batches(fetch_size, filters), path, file_format,
+                         compression, memory_limit_bytes)
+
+
+#Generator to read an exported file through a memory map, one record batch at a time.
+def read_user_batches(path, columns=None, batch_size=65536):
+    """Yield Arrow record batches from a Parquet or Arrow IPC export.
+
+    Uncompressed Arrow IPC batches are zero-copy views of the memory-mapped
+    file, while compressed ones are decompressed onto the heap; Parquet
+    pages are decompressed from the mapped file one batch at a time.
+    """
+    require_pyarrow()
+    source = pa.memory_map(path, "r")
+    try:
+        if source.read(6) == b"ARROW1":
+            source.seek(0)
+            reader = ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                batch = reader.get_batch(index)
+                yield batch.select(columns) if columns else batch
+        else:
+            source.seek(0)
+            for batch in pq.ParquetFile(source).iter_batches(batch_size=batch_size, columns=columns):
+                yield batch
+    finally:
+        source.close()
+
+
+#Calculate the average age from an export without touching MySQL.
+def calculate_average_age_from_export(path):
+    import pyarrow.compute as pc
+    total = 0.0
+    count = 0
+    for batch in read_user_batches(path, columns=["age"]):
+        ages = batch.column(0)
+        total += pc.sum(ages).as_py() or 0.0
+        count += len(ages) - ages.null_count
+    if count == 0:
+        return 0
+    return total / count
+
+
+#Export user_data to the file given on the command line (default user_data.parquet).
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "user_data.parquet"
+    file_format = "arrow" if path.endswith((".arrow", ".feather")) else "parquet"
+    rows = export_users(path, file_format)
+    print(f"Exported {rows} users to {path}")
+    print(f"Average age of users: {calculate_average_age_from_export(path):.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+from datetime import datetime
+import json
+import os
+
+# Load environment variables from .env file
+load_dotenv()
+
+DEFAULT_WATERMARK_PATH = "user_data.watermark"
+
+CHANGES_QUERY = """
+SELECT * FROM user_data
+WHERE (updated_at, user_id) > (%s, %s) AND updated_at <= %s
+ORDER BY updated_at, user_id
+LIMIT %s
+"""
+
+INITIAL_QUERY = """
+SELECT * FROM user_data
+WHERE updated_at <= %s
+ORDER BY updated_at, user_id
+LIMIT %s
+"""
+
+
+#Read the (updated_at, user_id) high-water mark, or None before the first run.
+def read_watermark(watermark_path=DEFAULT_WATERMARK_PATH):
+    try:
+        with open(watermark_path, mode='r', encoding='utf-8') as file:
+            watermark = json.load(file)
+        return datetime.fromisoformat(watermark['updated_at']), watermark['user_id']
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+
+#Atomically record the (updated_at, user_id) of the last row handed to the consumer.
+def write_watermark(watermark_path, updated_at, user_id):
+    temp_path = f"{watermark_path}.tmp"
+    with open(temp_path, mode='w', encoding='utf-8') as file:
+        json.dump({'updated_at': updated_at.isoformat(sep=' '), 'user_id': user_id}, file)
+    os.replace(temp_path, watermark_path)
+
+
+#Generator to stream rows inserted or updated since the last run's high-water mark.
+def stream_changes(watermark_path=DEFAULT_WATERMARK_PATH, page_size=1000, lag_seconds=1.0):
+    """Yield user_data rows changed since the watermark, oldest change first.
+
+    Rows are read in keyset pages on (updated_at, user_id), so the work is
+    proportional to the delta. The first run has no watermark and streams the
+    whole table. The watermark advances once the consumer asks for the row after
+    a page, giving at-least-once delivery across crashes. Rows newer than
+    NOW() - lag_seconds are left for the next run so that transactions still
+    committing with earlier timestamps are not skipped. Deletes are not tracked.
+    """
+    connection = None
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv("MYSQL_HOST"),
+            user=os.getenv("MYSQL_USER"),
+            password=os.getenv("MYSQL_PASSWORD"),
+            database=os.getenv("MYSQL_DATABASE")
+        )
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT NOW(6) - INTERVAL %s MICROSECOND AS upper_bound",
+            (int(lag_seconds * 1000000),)
+        )
+        upper_bound = cursor.fetchone()['upper_bound']
+        watermark = read_watermark(watermark_path)
+
+        # Loop 1: Seek past the watermark one page at a time
+        while True:
+            if watermark is None:
+                cursor.execute(INITIAL_QUERY, (upper_bound, page_size))
+            else:
+                cursor.execute(CHANGES_QUERY, watermark + (upper_bound, page_size))
+            page = cursor.fetchall()
+            if not page:
+                break
+            yield from page
+            watermark = (page[-1]['updated_at'], page[-1]['user_id'])
+            write_watermark(watermark_path, *watermark)
+
+        cursor.close()
+    except Error as e:
+        print(f"Error streaming changes from database: {e}")
+        return
+    finally:
+        if connection is not None and connection.is_connected():
+            connection.close()
+
+
+#Print the users changed since the last run.
+def main():
+    changed = 0
+    for user in stream_changes():
+        print(user)
+        changed += 1
+    print(f"{changed} users changed since the last run")
+
+if __name__ == "__main__":
+    main()
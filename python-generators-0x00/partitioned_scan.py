@@ -0,0 +1,196 @@
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pushdown import check_column
+from prefetch import prefetch
+from stream_stats import UserStats
+
+# Load environment variables from .env file
+load_dotenv()
+
+# user_id values are UUIDs, so their leading hex digits are uniformly distributed
+KEY_DIGITS = 4
+KEY_SPACE = 16 ** KEY_DIGITS
+
+# Marker a partition thread puts on the merge queue when it is done
+_DONE = object()
+
+
+#Split the user_id key space into `partitions` contiguous [low, high) ranges.
+def partition_bounds(partitions):
+    """Return (low, high) user_id prefixes; None means unbounded on that side.
+
+    >>> partition_bounds(4)
+    [(None, '4000'), ('4000', '8000'), ('8000', 'c000'), ('c000', None)]
+    """
+    if partitions < 1:
+        raise ValueError("partitions must be at least 1")
+    cuts = [f"{KEY_SPACE * i // partitions:0{KEY_DIGITS}x}" for i in range(1, partitions)]
+    return list(zip([None] + cuts, cuts + [None]))
+
+
+#Compile the SELECT for one user_id range.
+def compile_partition(low, high, columns=None, ordered=False):
+    select_list = ", ".join(check_column(column) for column in columns) if columns else "*"
+    conditions = []
+    params = []
+    if low is not None:
+        conditions.append("user_id >= %s")
+        params.append(low)
+    if high is not None:
+        conditions.append("user_id < %s")
+        params.append(high)
+    query = f"SELECT {select_list} FROM user_data"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if ordered:
+        query += " ORDER BY user_id"
+    return query, tuple(params)
+
+
+#Generator to stream batches of one user_id range over its own connection.
+def scan_partition(low, high, columns=None, ordered=False, fetch_size=1000):
+    connection = mysql.connector.connect(
+        host=os.getenv("MYSQL_HOST"),
+        user=os.getenv("MYSQL_USER"),
+        password=os.getenv("MYSQL_PASSWORD"),
+        database=os.getenv("MYSQL_DATABASE")
+    )
+    exhausted = False
+    try:
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        cursor.execute(*compile_partition(low, high, columns, ordered))
+        for rows in iter(lambda: cursor.fetchmany(fetch_size), []):
+            yield rows
+        exhausted = True
+        cursor.close()
+        connection.close()
+    finally:
+        if not exhausted:
+            connection.shutdown()
+
+
+#Generator to merge batches from several sources in arrival order.
+def merge_unordered(sources, buffer_size):
+    merged = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                merged.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(source):
+        try:
+            for batch in source:
+                if not put(batch):
+                    source.close()
+                    return
+            put(_DONE)
+        except Exception as e:
+            put(e)
+
+    threads = [threading.Thread(target=produce, args=(source,), daemon=True) for source in sources]
+    for thread in threads:
+        thread.start()
+    try:
+        remaining = len(threads)
+        while remaining:
+            item = merged.get()
+            if item is _DONE:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+
+
+#Generator to scan user_data as `partitions` concurrent user_id range scans.
+def partitioned_scan(partitions=4, columns=None, ordered=False, fetch_size=1000, buffer_size=None):
+    """Yield user_data rows scanned over one connection per partition.
+
+    Unordered, batches are yielded as soon as any partition produces them.
+    Ordered, each partition is sorted by user_id and partitions are yielded in
+    key order. Every partition starts fetching up front, so later partitions
+    read ahead up to buffer_size batches while earlier ones are consumed.
+    Threads overlap server and network time; row decoding still shares the GIL.
+    """
+    buffer_size = buffer_size or 2 * partitions
+    sources = [
+        scan_partition(low, high, columns, ordered, fetch_size)
+        for low, high in partition_bounds(partitions)
+    ]
+    if not ordered:
+        try:
+            for rows in merge_unordered(sources, buffer_size):
+                yield from rows
+        except Error as e:
+            print(f"Error scanning partitions: {e}")
+        return
+
+    # Prefetchers start their threads on creation, so all partitions scan concurrently
+    prefetched = [prefetch(source, buffer_size) for source in sources]
+    try:
+        for batches in prefetched:
+            for rows in batches:
+                yield from rows
+    except Error as e:
+        print(f"Error scanning partitions: {e}")
+    finally:
+        for batches in prefetched:
+            batches.close()
+
+
+#Accumulate UserStats for one partition.
+def partition_statistics(low, high, fetch_size=1000):
+    stats = UserStats()
+    for rows in scan_partition(low, high, ("age", "email"), fetch_size=fetch_size):
+        for user in rows:
+            stats.add(user)
+    return stats
+
+
+#Compute user statistics with one concurrent scan per partition, merging partial states.
+def partitioned_user_statistics(partitions=4, fetch_size=1000):
+    try:
+        with ThreadPoolExecutor(max_workers=partitions) as executor:
+            results = executor.map(
+                lambda bounds: partition_statistics(*bounds, fetch_size=fetch_size),
+                partition_bounds(partitions)
+            )
+            stats = UserStats()
+            for partial in results:
+                stats.merge(partial)
+            return stats
+    except Error as e:
+        print(f"Error scanning partitions: {e}")
+        return None
+
+
+#Calculate the average age with a partitioned scan.
+def calculate_average_age_partitioned(partitions=4):
+    stats = partitioned_user_statistics(partitions)
+    if stats is None or stats.ages.count == 0:
+        return 0
+    return stats.ages.mean
+
+
+#Demonstrate a partitioned scan and a partitioned aggregate.
+def main():
+    for user in partitioned_scan(4, ordered=True):
+        print(user)
+        break
+    print(f"Average age of users: {calculate_average_age_partitioned(4):.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+# 0-stream_users.py cannot be imported by name because it starts with a digit
+stream_users = __import__('0-stream_users').stream_users
+
+
+class Stage:
+    """One step of a Pipeline, with counters for items in/out and busy time.
+
+    Stages are lazy generators chained by pull, so a slow sink stops upstream
+    stages (and the database cursor) from reading ahead: that is the
+    pipeline's backpressure.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.busy_seconds += seconds
+
+    def timed(self, fn, item):
+        start = time.perf_counter()
+        try:
+            return fn(item)
+        finally:
+            self.record(time.perf_counter() - start)
+
+    def stats(self):
+        return {
+            'stage': self.name,
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'busy_seconds': self.busy_seconds,
+        }
+
+    def apply(self, upstream):
+        raise NotImplementedError
+
+
+class Map(Stage):
+    """Apply fn to every item, optionally on a thread pool of `workers` threads.
+
+    With workers, at most max_in_flight items are submitted ahead of the
+    consumer and results are yielded in input order.
+    """
+
+    def __init__(self, fn, workers=None, max_in_flight=None, name=None):
+        super().__init__(name or f"map:{getattr(fn, '__name__', 'fn')}")
+        self.fn = fn
+        self.workers = workers
+        self.max_in_flight = max_in_flight or (2 * workers if workers else 1)
+
+    def apply(self, upstream):
+        if not self.workers:
+            for item in upstream:
+                self.items_in += 1
+                result = self.timed(self.fn, item)
+                self.items_out += 1
+                yield result
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = deque()
+            for item in upstream:
+                self.items_in += 1
+                in_flight.append(executor.submit(self.timed, self.fn, item))
+                if len(in_flight) >= self.max_in_flight:
+                    self.items_out += 1
+                    yield in_flight.popleft().result()
+            while in_flight:
+                self.items_out += 1
+                yield in_flight.popleft().result()
+
+
+class Filter(Stage):
+    """Keep the items for which predicate returns a truthy value."""
+
+    def __init__(self, predicate, name=None):
+        super().__init__(name or f"filter:{getattr(predicate, '__name__', 'predicate')}")
+        self.predicate = predicate
+
+    def apply(self, upstream):
+        for item in upstream:
+            self.items_in += 1
+            if self.timed(self.predicate, item):
+                self.items_out += 1
+                yield item
+
+
+class Batch(Stage):
+    """Group items into lists of `size`; the last list may be shorter."""
+
+    def __init__(self, size, name=None):
+        super().__init__(name or f"batch:{size}")
+        self.size = size
+
+    def apply(self, upstream):
+        upstream = iter(upstream)
+        while True:
+            batch = list(islice(upstream, self.size))
+            if not batch:
+                return
+            self.items_in += len(batch)
+            self.items_out += 1
+            yield batch
+
+
+class Window(Stage):
+    """Yield windows of `size` items advancing by `step` (tumbling when step == size)."""
+
+    def __init__(self, size, step=None, name=None):
+        super().__init__(name or f"window:{size}")
+        self.size = size
+        self.step = step or size
+
+    def apply(self, upstream):
+        window = deque(maxlen=self.size)
+        pending = 0
+        for item in upstream:
+            self.items_in += 1
+            window.append(item)
+            pending += 1
+            if len(window) == self.size and pending >= self.step:
+                pending = 0
+                self.items_out += 1
+                yield list(window)
+        if pending and self.step == self.size:
+            self.items_out += 1
+            yield list(window)[-pending:]
+
+
+class Sink:
+    """Accumulates items from Pipeline.run; subclasses override add and result."""
+
+    def add(self, item):
+        raise NotImplementedError
+
+    def result(self):
+        return None
+
+
+class CollectSink(Sink):
+    def __init__(self):
+        self.items = []
+
+    def add(self, item):
+        self.items.append(item)
+
+    def result(self):
+        return self.items
+
+
+class CountSink(Sink):
+    def __init__(self):
+        self.count = 0
+
+    def add(self, item):
+        self.count += 1
+
+    def result(self):
+        return self.count
+
+
+class ForEachSink(Sink):
+    def __init__(self, fn):
+        self.fn = fn
+
+    def add(self, item):
+        self.fn(item)
+
+
+class ReduceSink(Sink):
+    def __init__(self, fn, initial):
+        self.fn = fn
+        self.value = initial
+
+    def add(self, item):
+        self.value = self.fn(self.value, item)
+
+    def result(self):
+        return self.value
+
+
+class Pipeline:
+    """Chain stages over a source iterable and drain it into one or more sinks.
+
+    >>> Pipeline(range(10)).filter(lambda n: n % 2).map(lambda n: n * n).run(CollectSink())
+    [1, 9, 25, 49, 81]
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.stages = []
+
+    def then(self, stage):
+        self.stages.append(stage)
+        return self
+
+    def map(self, fn, workers=None, max_in_flight=None, name=None):
+        return self.then(Map(fn, workers, max_in_flight, name))
+
+    def filter(self, predicate, name=None):
+        return self.then(Filter(predicate, name))
+
+    def batch(self, size, name=None):
+        return self.then(Batch(size, name))
+
+    def window(self, size, step=None, name=None):
+        return self.then(Window(size, step, name))
+
+    def __iter__(self):
+        stream = iter(self.source)
+        for stage in self.stages:
+            stream = stage.apply(stream)
+        return stream
+
+    def run(self, *sinks):
+        """Drain the pipeline once, feeding every item to every sink.
+
+        Several jobs can share one scan of the table by passing several sinks.
+        Returns the single sink's result, or a tuple of results.
+        """
+        sinks = sinks or (CountSink(),)
+        for item in self:
+            for sink in sinks:
+                sink.add(item)
+        results = tuple(sink.result() for sink in sinks)
+        return results[0] if len(results) == 1 else results
+
+    def stats(self):
+        return [stage.stats() for stage in self.stages]
+
+
+#Build a pipeline whose source is the stream_users generator.
+def users_pipeline(fetch_size=1000):
+    return Pipeline(stream_users(fetch_size))
+
+
+#Demonstrate one scan feeding two jobs: counting users over 25 and summing their ages.
+def main():
+    pipeline = users_pipeline().filter(lambda user: user['age'] > 25, name="over_25")
+    count, total_age = pipeline.run(
+        CountSink(),
+        ReduceSink(lambda total, user: total + float(user['age']), 0.0)
+    )
+    print(f"Users over 25: {count}, total age: {total_age:.2f}")
+    for stats in pipeline.stats():
+        print(stats)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import queue
+import threading
+import weakref
+
+# Marker put on the queue once the source generator is exhausted
+_DONE = object()
+
+
+class _Failure:
+    """Carries an exception raised by the source over to the consuming thread."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+#Put one item on the buffer, blocking while it is full, unless the consumer has gone.
+def _put(buffer, stop, item):
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+#Advance `source` into the buffer; runs on the prefetch thread and never references the Prefetcher.
+def _produce(source, buffer, stop):
+    iterator = iter(source)
+    try:
+        for item in iterator:
+            if not _put(buffer, stop, item):
+                return
+        _put(buffer, stop, _DONE)
+    except Exception as e:
+        _put(buffer, stop, _Failure(e))
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+class Prefetcher:
+    """Iterator over `source` whose items are fetched by a background thread.
+
+    The thread starts as soon as the Prefetcher is created, so several
+    prefetchers fetch concurrently even while only one is being consumed.
+    The source is only ever advanced by the background thread, so a generator
+    holding a database connection keeps it on that thread. At most buffer_size
+    items wait in the queue, which bounds memory. Exceptions from the source are
+    re-raised in the consumer. close() stops the thread and closes the source;
+    so does dropping the last reference, since the thread only holds the
+    queue and the stop event.
+    """
+
+    def __init__(self, source, buffer_size=2):
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        self._buffer = queue.Queue(maxsize=buffer_size)
+        self._stop = threading.Event()
+        self._finished = False
+        # Stop the thread once this iterator is garbage collected, even without close()
+        self._finalizer = weakref.finalize(self, self._stop.set)
+        self._worker = threading.Thread(
+            target=_produce, args=(source, self._buffer, self._stop), name="prefetch", daemon=True
+        )
+        self._worker.start()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+        item = self._buffer.get()
+        if item is _DONE:
+            self.close()
+            raise StopIteration
+        if isinstance(item, _Failure):
+            self.close()
+            raise item.error
+        return item
+
+    def close(self):
+        self._finished = True
+        self._finalizer()
+
+
+#Run `source` in a background thread, started immediately, up to buffer_size items ahead.
+def prefetch(source, buffer_size=2):
+    return Prefetcher(source, buffer_size)
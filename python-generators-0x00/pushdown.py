@@ -0,0 +1,117 @@
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+import os
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Identifiers that may appear in compiled SQL; values are always bound parameters
+FILTER_COLUMNS = ("user_id", "name", "email", "age")
+FILTER_OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "LIKE")
+AGGREGATES = {
+    "count": "COUNT({})",
+    "sum": "SUM({})",
+    "avg": "AVG({})",
+    "min": "MIN({})",
+    "max": "MAX({})",
+}
+
+
+#Check that a column name is one of the user_data columns.
+def check_column(column):
+    if column not in FILTER_COLUMNS:
+        raise ValueError(f"Unknown user_data column: {column}")
+    return column
+
+
+#Compile (column, operator, value) filters into a WHERE clause and its parameters.
+def compile_where(filters):
+    """Return ("WHERE a > %s AND ...", params), or ("", ()) when there are no filters.
+
+    >>> compile_where([("age", ">", 25)])
+    ('WHERE age > %s', (25,))
+    """
+    if not filters:
+        return "", ()
+    conditions = []
+    params = []
+    for column, operator, value in filters:
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        conditions.append(f"{check_column(column)} {operator} %s")
+        params.append(value)
+    return "WHERE " + " AND ".join(conditions), tuple(params)
+
+
+#Compile a SELECT over user_data with optional filters.
+def compile_select(columns=None, filters=None):
+    select_list = ", ".join(check_column(column) for column in columns) if columns else "*"
+    where, params = compile_where(filters)
+    return f"SELECT {select_list} FROM user_data {where}".strip(), params
+
+
+#Compile an aggregate over user_data with optional filters.
+def compile_aggregate(function, column="age", filters=None):
+    if function not in AGGREGATES:
+        raise ValueError(f"Unsupported aggregate: {function}")
+    target = "*" if function == "count" and column == "*" else check_column(column)
+    where, params = compile_where(filters)
+    return f"SELECT {AGGREGATES[function].format(target)} FROM user_data {where}".strip(), params
+
+
+#Compile a fixed-width histogram over a numeric column with optional filters.
+def compile_histogram(column="age", bucket_width=10, filters=None):
+    column = check_column(column)
+    where, params = compile_where(filters)
+    query = " ".join(part for part in (
+        f"SELECT FLOOR({column} / %s) * %s AS bucket, COUNT(*) AS users FROM user_data",
+        where,
+        "GROUP BY bucket ORDER BY bucket",
+    ) if part)
+    return query, (bucket_width, bucket_width) + params
+
+
+#Connect to the ALX_prodev database.
+def connect():
+    return mysql.connector.connect(
+        host=os.getenv("MYSQL_HOST"),
+        user=os.getenv("MYSQL_USER"),
+        password=os.getenv("MYSQL_PASSWORD"),
+        database=os.getenv("MYSQL_DATABASE")
+    )
+
+
+#Run a compiled query and return all result rows, or None if the query fails.
+def run_query(query, params):
+    connection = None
+    try:
+        connection = connect()
+        cursor = connection.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    except Error as e:
+        print(f"Error running pushed-down query: {e}")
+        return None
+    finally:
+        if connection is not None and connection.is_connected():
+            connection.close()
+
+
+#Compute an aggregate in SQL; returns None if the query fails.
+def aggregate(function, column="age", filters=None):
+    rows = run_query(*compile_aggregate(function, column, filters))
+    if rows is None:
+        return None
+    (value,) = rows[0]
+    return float(value) if value is not None and function != "count" else value
+
+
+#Compute a histogram in SQL as {bucket_start: count}; returns None if the query fails.
+def histogram(column="age", bucket_width=10, filters=None):
+    rows = run_query(*compile_histogram(column, bucket_width, filters))
+    if rows is None:
+        return None
+    return {float(bucket): users for bucket, users in rows}
@@ -0,0 +1,109 @@
+from collections import namedtuple
+from functools import lru_cache
+
+
+class RowMixin:
+    """Dict-style access for compact rows, so callers using row['age'] keep working."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return self._values()[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except (KeyError, IndexError):
+            return default
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return self._values()
+
+    def items(self):
+        return zip(self._fields, self._values())
+
+    def _asdict(self):
+        return dict(self.items())
+
+    def __contains__(self, key):
+        return key in self._fields
+
+
+#Build a __slots__ record class with one slot per column.
+def _slots_class(columns):
+    def __init__(self, *values):
+        for field, value in zip(columns, values):
+            setattr(self, field, value)
+
+    def _values(self):
+        return tuple(getattr(self, field) for field in columns)
+
+    def __repr__(self):
+        return "UserRecord(" + ", ".join(f"{field}={value!r}" for field, value in self.items()) + ")"
+
+    def __eq__(self, other):
+        if isinstance(other, RowMixin):
+            return self._fields == other._fields and self._values() == other._values()
+        if isinstance(other, dict):
+            return self._asdict() == other
+        return NotImplemented
+
+    return type("UserRecord", (RowMixin,), {
+        "__slots__": columns,
+        "_fields": columns,
+        "__init__": __init__,
+        "_values": _values,
+        "__repr__": __repr__,
+        "__eq__": __eq__,
+        "__hash__": None,
+    })
+
+
+#Build a tuple-backed named row class whose fields are shared class metadata.
+def _namedtuple_class(columns):
+    base = namedtuple("UserRow", columns)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return RowMixin.__getitem__(self, key)
+        return tuple.__getitem__(self, key)
+
+    def _values(self):
+        return tuple(self)
+
+    return type("UserRow", (RowMixin, base), {
+        "__slots__": (),
+        "__getitem__": __getitem__,
+        "__contains__": RowMixin.__contains__,
+        "_values": _values,
+    })
+
+
+ROW_CLASSES = {
+    "record": _slots_class,
+    "namedtuple": _namedtuple_class,
+}
+
+
+@lru_cache(maxsize=None)
+def row_class(columns, kind="record"):
+    """Return the shared row class for a column tuple; built once per column set."""
+    if kind not in ROW_CLASSES:
+        raise ValueError(f"Unknown row factory: {kind}")
+    return ROW_CLASSES[kind](tuple(columns))
+
+
+#Return a function turning a cursor's tuple rows into compact rows of `kind`.
+def row_maker(columns, kind="record"):
+    cls = row_class(tuple(columns), kind)
+    if kind == "namedtuple":
+        return cls._make
+    return lambda values: cls(*values)
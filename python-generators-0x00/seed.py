@@ -1,9 +1,20 @@
 import mysql.connector
 import csv
+import hashlib
+import json
+import math
+import mmap
+import re
 import uuid
 from mysql.connector import Error
 from dotenv import load_dotenv
 import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import itemgetter
 
 # Load environment variables 
 load_dotenv()
@@ -35,14 +46,15 @@ def create_database(connection):
     except Error as e:
         print(f"Error creating database: {e}")
 
-def connect_to_prodev():
+def connect_to_prodev(allow_local_infile=False):
     """Connect to the ALX_prodev database."""
     try:
         connection = mysql.connector.connect(
             host=os.getenv("MYSQL_HOST"),
             user=os.getenv("MYSQL_USER"),
             password=os.getenv("MYSQL_PASSWORD"),
-            database=os.getenv("MYSQL_DATABASE")
+            database=os.getenv("MYSQL_DATABASE"),
+            allow_local_infile=allow_local_infile
         )
         if connection.is_connected():
             print("Successfully connected to ALX_prodev database")
@@ -62,7 +74,11 @@ def create_table(connection):
             name VARCHAR(255) NOT NULL,
             email VARCHAR(255) NOT NULL,
             age DECIMAL(5,2) NOT NULL,
-            INDEX idx_user_id (user_id)
+            updated_at TIMESTAMP(6) NOT NULL
+                DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+            INDEX idx_user_id (user_id),
+            INDEX idx_email (email),
+            INDEX idx_updated_at (updated_at, user_id)
         )
         """
         cursor.execute(create_table_query)
@@ -73,25 +89,266 @@ def create_table(connection):
         print(f"Error creating table: {e}")
 
 
+#Add the updated_at change-tracking column to a user_data table created before it existed
+def add_updated_at_column(connection):
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'user_data' AND COLUMN_NAME = 'updated_at'
+        """)
+        (exists,) = cursor.fetchone()
+        if not exists:
+            cursor.execute("""
+            ALTER TABLE user_data
+            ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+                DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+            ADD INDEX idx_updated_at (updated_at, user_id)
+            """)
+            connection.commit()
+            print("Column updated_at added to user_data")
+        cursor.close()
+    except Error as e:
+        print(f"Error adding updated_at column: {e}")
+
+
+
+#Add the email index used by duplicate checks to a user_data table created before it existed
+def add_email_index(connection):
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'user_data' AND INDEX_NAME = 'idx_email'
+        """)
+        (exists,) = cursor.fetchone()
+        if not exists:
+            cursor.execute("ALTER TABLE user_data ADD INDEX idx_email (email)")
+            connection.commit()
+            print("Index idx_email added to user_data")
+        cursor.close()
+    except Error as e:
+        print(f"Error adding email index: {e}")
+
+
+#Normalize an email so case and surrounding whitespace do not hide duplicates
+def normalize_email(email):
+    return email.strip().lower()
+
+
+#Derive a stable user_id from an email so re-running a load does not duplicate users
+def deterministic_user_id(email):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"mailto:{normalize_email(email)}"))
+
+
+#Generator to normalize parsed CSV rows into user_data rows
+def normalize_rows(csv_reader, deterministic_ids=False):
+    for row in csv_reader:
+        try:
+            yield {
+                # Generate a new UUID for each row unless deterministic ids were requested
+                'user_id': deterministic_user_id(row['email']) if deterministic_ids else str(uuid.uuid4()),
+                'name': row['name'],
+                'email': row['email'],
+                'age': float(row['age'])
+            }
+        except KeyError as e:
+            print(f"Missing column {e} in row, skipping")
+            continue
+        except ValueError:
+            print(f"Invalid age value in row: {row['age']}, skipping")
+            continue
+
 
 #Generator to read CSV file row by row
 def csv_reader_generator(file_path):
     with open(file_path, mode='r', encoding='utf-8') as file:
-        csv_reader = csv.DictReader(file)
-        for row in csv_reader:
-            try:
-                yield {
-                    'user_id': str(uuid.uuid4()),  # Generate a new UUID for each row
-                    'name': row['name'],
-                    'email': row['email'],
-                    'age': float(row['age'])
-                }
-            except KeyError as e:
-                print(f"Missing column {e} in row, skipping")
-                continue
-            except ValueError:
-                print(f"Invalid age value in row: {row['age']}, skipping")
-                continue
+        yield from normalize_rows(csv.DictReader(file))
+
+
+MMAP_BLOCK_SIZE = 1 << 20  # Bytes of the mapped file split into lines at a time
+
+
+#Split one CSV line into its fields
+def split_csv_line(line, columns):
+    if not line.count('"'):
+        fields = line.split(',')  # Unquoted row
+    elif line.count('"') == 2 * columns and line[:1] == '"' and line[-1:] == '"' and '""' not in line:
+        fields = line[1:-1].split('","')  # Every field quoted, no escaped quotes inside
+    else:
+        fields = next(csv.reader([line]))
+    return fields
+
+
+#Split a block of CSV lines into lists of fields, taking a fast path when possible
+def split_csv_block(block, columns):
+    if '\r' in block:
+        block = block.replace('\r', '')
+    lines = [line for line in block.split('\n') if line]
+    if '"' not in block:
+        rows = [line.split(',') for line in lines]
+    elif '""' not in block and block.count('"') == 2 * columns * len(lines):
+        # Every field of every line is quoted and nothing needs unescaping
+        rows = [line[1:-1].split('","') for line in lines]
+    else:
+        rows = [split_csv_line(line, columns) for line in lines]
+    if set(map(len, rows)) <= {columns}:
+        return rows
+    valid = []
+    for line, fields in zip(lines, rows):
+        if len(fields) != columns:
+            fields = split_csv_line(line, columns)
+        if len(fields) == columns:
+            valid.append(fields)
+        else:
+            print(f"Malformed row {line[:80]!r}, skipping")
+    return valid
+
+
+#Generator to scan a CSV through mmap, yielding tuples of only the wanted fields.
+def mmap_csv_fields(file_path, wanted=('name', 'email', 'age')):
+    """Yield a tuple of decoded strings per row, in the order of `wanted`.
+
+    The file is mapped read-only; each block is decoded with one call and
+    split with str methods, so no file object, per-row dict or
+    csv.DictReader is involved. Rows must not contain embedded newlines. Like the
+    DictReader path, an empty file or a header missing a wanted column
+    yields no rows.
+    """
+    with open(file_path, mode='rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return  # An empty file cannot be mapped and has no rows
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from _mapped_csv_fields(mapped, wanted)
+
+
+#Yield the `wanted` fields of every row of a non-empty mapped CSV file
+def _mapped_csv_fields(mapped, wanted):
+    header_end = mapped.find(b'\n')
+    if header_end == -1:
+        header_end = len(mapped)
+    header = next(csv.reader([mapped[:header_end].decode('utf-8').rstrip('\r')]), [])
+    missing = [column for column in wanted if column not in header]
+    if missing:
+        print(f"Missing column {missing[0]!r} in header, skipping file")
+        return
+    pick = itemgetter(*[header.index(column) for column in wanted])
+    if len(wanted) == 1:
+        single = pick
+        pick = lambda fields: (single(fields),)
+    columns = len(header)
+
+    position = header_end + 1
+    while position < len(mapped):
+        if position + MMAP_BLOCK_SIZE >= len(mapped):
+            block_end = len(mapped)
+        else:
+            block_end = mapped.rfind(b'\n', position, position + MMAP_BLOCK_SIZE)
+        if block_end == -1:
+            # No newline in this block: the rest of a long line or the last line
+            block_end = mapped.find(b'\n', position + MMAP_BLOCK_SIZE)
+            if block_end == -1:
+                block_end = len(mapped)
+        # A block ends on a newline byte, which never falls inside a UTF-8 sequence
+        yield from map(pick, split_csv_block(mapped[position:block_end].decode('utf-8'), columns))
+        position = block_end + 1
+
+
+#Generator to read CSV rows through mmap as normalized user_data rows
+def mmap_reader_generator(file_path, deterministic_ids=False):
+    for name, email, age in mmap_csv_fields(file_path):
+        try:
+            age = float(age)
+        except ValueError:
+            print(f"Invalid age value in row: {age}, skipping")
+            continue
+        yield {
+            'user_id': deterministic_user_id(email) if deterministic_ids else str(uuid.uuid4()),
+            'name': name,
+            'email': email,
+            'age': age
+        }
+
+
+#Split the CSV data section into byte ranges aligned to line boundaries
+def shard_offsets(file_path, shards):
+    """Return up to `shards` (start, end) byte ranges covering every data row.
+
+    Each boundary is moved forward to the start of the next line, so no row is
+    split between shards. Rows must not contain embedded newlines.
+    """
+    with open(file_path, mode='rb') as file:
+        file.readline()  # Skip the header row
+        data_start = file.tell()
+        size = file.seek(0, os.SEEK_END)
+        step = max((size - data_start) // shards, 1)
+        offsets = [data_start]
+        for shard in range(1, shards):
+            file.seek(max(data_start + shard * step - 1, offsets[-1]))
+            file.readline()  # Finish the line the boundary landed in
+            position = file.tell()
+            if offsets[-1] < position < size:
+                offsets.append(position)
+        offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+#Generator to read the CSV rows that start within the byte range [start, end)
+def csv_shard_generator(file_path, start, end):
+    with open(file_path, mode='rb') as file:
+        header = next(csv.reader([file.readline().decode('utf-8')]))
+        file.seek(start)
+
+        def lines():
+            position = start
+            while position < end:
+                line = file.readline()
+                if not line:
+                    return
+                position += len(line)
+                yield line.decode('utf-8')
+
+        yield from normalize_rows(csv.DictReader(lines(), fieldnames=header))
+
+
+#Worker: bulk-load one shard of the CSV over its own connection
+def ingest_shard(file_path, start, end, chunk_size=1000):
+    start_time = time.perf_counter()
+    connection = connect_to_prodev()
+    if not connection:
+        return 0, 0.0
+    try:
+        rows = insert_data_bulk(connection, csv_shard_generator(file_path, start, end), chunk_size)
+    finally:
+        connection.close()
+    return rows, time.perf_counter() - start_time
+
+
+#Load the CSV concurrently, one byte-range shard per worker process.
+def parallel_ingest(file_path, workers=None, chunk_size=1000):
+    """Parse and insert CSV shards in a ProcessPoolExecutor.
+
+    Every worker opens its own connection to ALX_prodev. Per-worker and total
+    throughput are printed when all shards finish. Returns the number of rows loaded.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shard_offsets(file_path, workers)
+    start_time = time.perf_counter()
+    total = 0
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(ingest_shard, file_path, start, end, chunk_size)
+            for start, end in shards
+        ]
+        for worker, future in enumerate(futures):
+            rows, elapsed = future.result()
+            rate = rows / elapsed if elapsed > 0 else 0
+            print(f"Worker {worker}: {rows} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+            total += rows
+    elapsed = time.perf_counter() - start_time
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Loaded {total} rows with {len(shards)} workers in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return total
 
 
 
@@ -115,6 +372,314 @@ def insert_data(connection, data):
     except Error as e:
         print(f"Error inserting data: {e}")
 
+#Generator to group rows from any row generator into lists of chunk_size rows
+def chunked(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+INSERT_IGNORE_QUERY = """
+INSERT IGNORE INTO user_data (user_id, name, email, age)
+VALUES (%s, %s, %s, %s)
+"""
+
+
+#Bulk-load data into the user_data table using multi-row INSERT batches.
+def insert_data_bulk(connection, data, chunk_size=1000, commit_every=10):
+    """Insert rows in chunks of chunk_size, committing every commit_every chunks.
+
+    INSERT IGNORE replaces the per-row existence check: rows whose user_id is
+    already present are skipped by the server. mysql-connector rewrites an
+    executemany() INSERT into a single multi-row INSERT statement per chunk.
+    On an error the uncommitted chunks are rolled back. Returns the number
+    of rows committed.
+    """
+    total = 0
+    pending = 0  # Rows sent since the last commit
+    start = time.perf_counter()
+    try:
+        cursor = connection.cursor()
+        for chunk_number, chunk in enumerate(chunked(data, chunk_size), start=1):
+            cursor.executemany(INSERT_IGNORE_QUERY, [
+                (row['user_id'], row['name'], row['email'], row['age'])
+                for row in chunk
+            ])
+            pending += len(chunk)
+            if chunk_number % commit_every == 0:
+                connection.commit()
+                total, pending = total + pending, 0
+        connection.commit()
+        total, pending = total + pending, 0
+        cursor.close()
+    except Error as e:
+        print(f"Error bulk inserting data: {e}")
+        try:
+            connection.rollback()
+        except Error as rollback_error:
+            print(f"Error rolling back bulk insert: {rollback_error}")
+        if pending:
+            print(f"Rolled back {pending} uncommitted rows")
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Loaded {total} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return total
+
+# Errors raised when the client or server refuses LOAD DATA LOCAL INFILE
+LOCAL_INFILE_DISABLED_ERRNOS = {
+    1148,  # ER_NOT_ALLOWED_COMMAND
+    2068,  # CR_LOAD_DATA_LOCAL_INFILE_REJECTED
+    3948,  # ER_CLIENT_LOCAL_FILES_DISABLED
+}
+
+
+#Generator to read back rows written by load_data_infile
+def spooled_rows(file):
+    file.seek(0)
+    for user_id, name, email, age in csv.reader(file):
+        yield {'user_id': user_id, 'name': name, 'email': email, 'age': age}
+
+
+#Load data into the user_data table with server-side LOAD DATA LOCAL INFILE.
+def load_data_infile(connection, data):
+    """Spool normalized rows to a temp file and ingest it with LOAD DATA.
+
+    The connection must be opened with connect_to_prodev(allow_local_infile=True).
+    When the client or server does not allow local infile, the spooled rows
+    are loaded through insert_data_bulk instead. Returns the number of rows loaded.
+    """
+    load_query = """
+    LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE user_data
+    FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+    LINES TERMINATED BY '\\n'
+    (user_id, name, email, age)
+    """
+    with tempfile.NamedTemporaryFile(mode='w+', encoding='utf-8', newline='', suffix='.csv') as spool:
+        writer = csv.writer(spool, lineterminator='\n')
+        total = 0
+        for row in data:
+            writer.writerow((row['user_id'], row['name'], row['email'], row['age']))
+            total += 1
+        spool.flush()
+
+        start = time.perf_counter()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(load_query, (spool.name,))
+            connection.commit()
+            cursor.close()
+        except Error as e:
+            if e.errno not in LOCAL_INFILE_DISABLED_ERRNOS:
+                print(f"Error loading data from file: {e}")
+                return 0
+            print(f"LOCAL INFILE not allowed ({e}), falling back to batched INSERT")
+            return insert_data_bulk(connection, spooled_rows(spool))
+        elapsed = time.perf_counter() - start
+        rate = total / elapsed if elapsed > 0 else 0
+        print(f"Loaded {total} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+        return total
+
+#Identify a CSV file by size, modification time and a hash of its first block
+def file_identity(file, block_size=65536):
+    stat = os.fstat(file.fileno())
+    head = os.pread(file.fileno(), block_size, 0)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'head': hashlib.blake2b(head, digest_size=16).hexdigest(),
+    }
+
+
+#Read the committed byte offset from a checkpoint sidecar file, or 0 if it belongs to another file
+def read_checkpoint(checkpoint_path, identity):
+    try:
+        with open(checkpoint_path, mode='r', encoding='utf-8') as file:
+            checkpoint = json.load(file)
+        if checkpoint.get('file') != identity:
+            return 0
+        return int(checkpoint['offset'])
+    except (FileNotFoundError, ValueError, KeyError, TypeError, AttributeError):
+        return 0
+
+
+#Atomically record the committed byte offset and the file it belongs to in a checkpoint sidecar file
+def write_checkpoint(checkpoint_path, offset, identity):
+    temp_path = f"{checkpoint_path}.tmp"
+    with open(temp_path, mode='w', encoding='utf-8') as file:
+        json.dump({'offset': offset, 'file': identity}, file)
+    os.replace(temp_path, checkpoint_path)
+
+
+#Load data resumably, checkpointing the byte offset after every committed chunk.
+def checkpointed_ingest(connection, file_path, chunk_size=1000, checkpoint_path=None):
+    """Bulk-load the CSV with deterministic user_ids and a byte-offset checkpoint.
+
+    user_ids are uuid5 values derived from the email, so a chunk replayed after a
+    crash is ignored by INSERT IGNORE instead of duplicating users. After each
+    commit the end offset of the chunk is written to `<file_path>.checkpoint`,
+    together with the file's size, mtime and a hash of its first block; a
+    restart seeks straight to the offset only if the file still matches. The
+    sidecar is removed once the whole file has loaded, and deleting it forces a
+    full reload. Returns the number of rows loaded by this run.
+    """
+    checkpoint_path = checkpoint_path or f"{file_path}.checkpoint"
+    total = 0
+    start = time.perf_counter()
+    with open(file_path, mode='rb') as file:
+        header_line = file.readline()
+        header = next(csv.reader([header_line.decode('utf-8')]))
+        identity = file_identity(file)
+        size = identity['size']
+        offset = read_checkpoint(checkpoint_path, identity)
+        if not len(header_line) <= offset <= size:
+            offset = len(header_line)  # Missing checkpoint or one for another file: start from the first row
+        if offset > len(header_line):
+            print(f"Resuming from byte {offset} of {size}")
+        file.seek(offset)
+        try:
+            cursor = connection.cursor()
+            for lines in chunked(file, chunk_size):
+                rows = list(normalize_rows(
+                    csv.DictReader((line.decode('utf-8') for line in lines), fieldnames=header),
+                    deterministic_ids=True
+                ))
+                cursor.executemany(INSERT_IGNORE_QUERY, [
+                    (row['user_id'], row['name'], row['email'], row['age'])
+                    for row in rows
+                ])
+                connection.commit()
+                offset += sum(len(line) for line in lines)
+                write_checkpoint(checkpoint_path, offset, identity)
+                total += len(rows)
+            cursor.close()
+            # The whole file is loaded; a later run of a new file must not resume
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+        except Error as e:
+            print(f"Error loading data at byte {offset}, rerun to resume: {e}")
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Loaded {total} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return total
+
+class BloomFilter:
+    """Set membership with no false negatives and a tunable false-positive rate.
+
+    Sized for `capacity` items at `error_rate`; positions come from double
+    hashing one 128-bit blake2b digest.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+#Preload a Bloom filter with the normalized emails already in user_data
+def load_email_filter(connection, error_rate=0.01, fetch_size=10000):
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM user_data")
+    (existing,) = cursor.fetchone()
+    cursor.close()
+    # Only table emails are added (in-file duplicates go to a digest set), so
+    # the table size is the capacity; the floor keeps an empty table usable
+    email_filter = BloomFilter(max(existing, 1000), error_rate)
+    cursor = connection.cursor(buffered=False)
+    cursor.execute("SELECT email FROM user_data")
+    for rows in iter(lambda: cursor.fetchmany(fetch_size), []):
+        for (email,) in rows:
+            email_filter.add(normalize_email(email))
+    cursor.close()
+    return email_filter
+
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+#Return why a normalized row is invalid, or None if it can be loaded
+def validation_error(row):
+    if not row['name'].strip():
+        return "empty name"
+    if not EMAIL_PATTERN.match(row['email']):
+        return f"invalid email {row['email']!r}"
+    if not 0 <= row['age'] < 1000:
+        return f"age {row['age']} out of range"
+    return None
+
+
+#Return the subset of normalized emails that already exist in user_data
+def existing_emails(connection, emails):
+    if not emails:
+        return set()
+    cursor = connection.cursor()
+    placeholders = ", ".join(["%s"] * len(emails))
+    cursor.execute(f"SELECT email FROM user_data WHERE email IN ({placeholders})", tuple(emails))
+    found = {normalize_email(email) for (email,) in cursor.fetchall()}
+    cursor.close()
+    return found
+
+
+#Generator to validate rows and drop duplicate emails within the file and against user_data.
+def validate_rows(rows, connection=None, chunk_size=1000, error_rate=0.01):
+    """Yield valid rows with normalized emails, skipping duplicates.
+
+    Duplicates within the file are caught with a set of 64-bit email digests,
+    which is probabilistic: two different emails sharing a digest would drop
+    the second, though for n rows the odds are about n**2 / 2**65.
+    Duplicates against the table are screened by a Bloom filter
+    preloaded from user_data. Only emails the filter reports as possibly
+    present are checked exactly, with one IN query per chunk of rows.
+    Pass connection=None to skip the table check.
+    """
+    email_filter = load_email_filter(connection, error_rate) if connection else None
+    seen = set()
+    counts = {'valid': 0, 'invalid': 0, 'file_duplicates': 0, 'table_duplicates': 0, 'exact_checks': 0}
+    for chunk in chunked(rows, chunk_size):
+        candidates = []
+        for row in chunk:
+            row['email'] = normalize_email(row['email'])
+            error = validation_error(row)
+            if error:
+                print(f"Invalid row for {row['name']!r}: {error}, skipping")
+                counts['invalid'] += 1
+                continue
+            digest = hashlib.blake2b(row['email'].encode('utf-8'), digest_size=8).digest()
+            if digest in seen:
+                counts['file_duplicates'] += 1
+                continue
+            seen.add(digest)
+            candidates.append(row)
+
+        suspects = [row['email'] for row in candidates if email_filter and row['email'] in email_filter]
+        found = set()
+        if suspects:
+            counts['exact_checks'] += 1
+            found = existing_emails(connection, suspects)
+        for row in candidates:
+            if row['email'] in found:
+                counts['table_duplicates'] += 1
+                continue
+            counts['valid'] += 1
+            yield row
+    print("Validation: " + ", ".join(f"{name}={count}" for name, count in counts.items()))
+
 def main():
     # Step 1: Connect to MySQL server
     connection = connect_db()
@@ -126,17 +691,34 @@ def main():
     connection.close()
 
     # Step 3: Connect to ALX_prodev database
-    connection = connect_to_prodev()
+    mode = sys.argv[1] if len(sys.argv) > 1 else "rows"
+    connection = connect_to_prodev(allow_local_infile=(mode == "infile"))
     if not connection:
         return
 
     # Step 4: Create user_data table
     create_table(connection)
+    add_updated_at_column(connection)
+    add_email_index(connection)
 
     # Step 5: Read CSV using generator and insert data
     csv_file_path = "user_data.csv"  
     data_generator = csv_reader_generator(csv_file_path)
-    insert_data(connection, data_generator)
+    if mode == "mmap":
+        insert_data_bulk(connection, mmap_reader_generator(csv_file_path))
+    elif mode == "dedup":
+        insert_data_bulk(connection, validate_rows(data_generator, connection))
+    elif mode == "resume":
+        checkpointed_ingest(connection, csv_file_path)
+    elif mode == "parallel":
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        parallel_ingest(csv_file_path, workers)
+    elif mode == "infile":
+        load_data_infile(connection, data_generator)
+    elif mode == "bulk":
+        insert_data_bulk(connection, data_generator)
+    else:
+        insert_data(connection, data_generator)
 
     # Step 6: Close the connection
     if connection.is_connected():
@@ -0,0 +1,226 @@
+import hashlib
+import math
+import random
+
+# 0-stream_users.py and 4-stream_ages.py cannot be imported by name because they start with a digit
+stream_users = __import__('0-stream_users').stream_users
+stream_user_ages = __import__('4-stream_ages').stream_user_ages
+
+
+class RunningStats:
+    """Single-pass count, mean, variance, min and max (Welford's algorithm).
+
+    Partial states from different shards combine exactly with merge().
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self, sample=False):
+        denominator = self.count - 1 if sample else self.count
+        return self.m2 / denominator if denominator > 0 else 0.0
+
+    def stddev(self, sample=False):
+        return math.sqrt(self.variance(sample))
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch (KLL) using O(k log(n/k)) memory.
+
+    Level h holds items that each stand for 2**h inputs. A full level is
+    sorted and every other item promoted, so rank error stays around 1/k.
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.levels = [[]]
+        self.size = 0
+        self.max_size = self._capacity(0)
+        self._random = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def _grow(self):
+        self.levels.append([])
+        self.max_size = sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _compress(self):
+        for level in range(len(self.levels)):
+            items = self.levels[level]
+            if len(items) < self._capacity(level):
+                continue
+            if level + 1 == len(self.levels):
+                self._grow()
+            items.sort()
+            keep_last = items.pop() if len(items) % 2 else None
+            offset = self._random.randint(0, 1)
+            self.levels[level + 1].extend(items[offset::2])
+            self.levels[level] = [keep_last] if keep_last is not None else []
+            self.size = sum(len(items) for items in self.levels)
+            if self.size < self.max_size:
+                break
+
+    def add(self, value):
+        self.levels[0].append(value)
+        self.size += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.size = sum(len(items) for items in self.levels)
+        while self.size >= self.max_size:
+            self._compress()
+        return self
+
+    def quantile(self, q):
+        """Return an approximate q-quantile (0 <= q <= 1), or None when empty."""
+        weighted = sorted(
+            (value, 2 ** level)
+            for level, items in enumerate(self.levels)
+            for value in items
+        )
+        if not weighted:
+            return None
+        target = q * sum(weight for _, weight in weighted)
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return value
+        return weighted[-1][0]
+
+    def quantiles(self, qs):
+        return {q: self.quantile(q) for q in qs}
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2**precision one-byte registers.
+
+    Relative error is about 1.04 / sqrt(2**precision) (0.8% at the default 14);
+    merge() takes the register-wise max, so shards combine losslessly.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        index = hashed >> (64 - self.precision)
+        remainder_bits = 64 - self.precision
+        remainder = hashed & ((1 << remainder_bits) - 1)
+        rank = remainder_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return int(round(estimate))
+
+
+#Normalize an email so case and surrounding whitespace do not create distinct values.
+def normalize_email(email):
+    return email.strip().lower()
+
+
+class UserStats:
+    """Age statistics and distinct emails accumulated in one pass over user rows."""
+
+    def __init__(self, k=200, precision=14):
+        self.ages = RunningStats()
+        self.age_quantiles = QuantileSketch(k)
+        self.emails = HyperLogLog(precision)
+
+    def add(self, user):
+        age = float(user['age'])
+        self.ages.add(age)
+        self.age_quantiles.add(age)
+        self.emails.add(normalize_email(user['email']))
+
+    def merge(self, other):
+        self.ages.merge(other.ages)
+        self.age_quantiles.merge(other.age_quantiles)
+        self.emails.merge(other.emails)
+        return self
+
+    def summary(self, qs=(0.25, 0.5, 0.75, 0.9, 0.99)):
+        return {
+            'count': self.ages.count,
+            'mean': self.ages.mean,
+            'variance': self.ages.variance(),
+            'stddev': self.ages.stddev(),
+            'min': self.ages.min if self.ages.count else None,
+            'max': self.ages.max if self.ages.count else None,
+            'median': self.age_quantiles.quantile(0.5),
+            'percentiles': self.age_quantiles.quantiles(qs),
+            'distinct_emails': self.emails.count(),
+        }
+
+
+#Summarize a stream of ages (stream_user_ages by default) in a single pass.
+def age_statistics(ages=None, k=200):
+    running = RunningStats()
+    sketch = QuantileSketch(k)
+    for age in stream_user_ages() if ages is None else ages:
+        running.add(age)
+        sketch.add(age)
+    return running, sketch
+
+
+#Summarize a stream of user rows (stream_users by default) in a single pass.
+def user_statistics(users=None):
+    stats = UserStats()
+    for user in stream_users() if users is None else users:
+        stats.add(user)
+    return stats
+
+
+#Print age statistics and distinct email count for user_data.
+def main():
+    for name, value in user_statistics().summary().items():
+        print(f"{name}: {value}")
+
+if __name__ == "__main__":
+    main()